@@ -0,0 +1,70 @@
+''' Compare whole-image and band-blocked composite_subtiles throughput
+
+Usage: python benchmarks/band_blocking.py [--sizes 4096 8192] [--channels 8]
+'''
+
+import argparse
+import time
+import numpy as np
+from minerva_lib.render import (composite_subtiles, get_band_height,
+                                select_grids)
+
+
+def make_tiles(size, tile_size, channels):
+    ''' Random uint16 tiles covering a square image of _size_ '''
+
+    rng = np.random.default_rng(0)
+    tile_shape = (tile_size, tile_size)
+    images = [rng.integers(0, 65535, tile_shape, dtype=np.uint16)
+              for _ in range(channels)]
+    colors = rng.random((channels, 3))
+
+    return [{
+        'grid': grid,
+        'image': images[c],
+        'color': colors[c],
+        'min': 0.1,
+        'max': 0.9
+    } for grid in select_grids(tile_shape, (0, 0), (size, size))
+        for c in range(channels)]
+
+
+def best_time(repeat, *args, **kwargs):
+    ''' Best wall time of _repeat_ renders '''
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        composite_subtiles(*args, **kwargs)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[4096, 8192])
+    parser.add_argument('--channels', type=int, default=8)
+    parser.add_argument('--tile', type=int, default=1024)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--dtype', default='float32')
+    args = parser.parse_args()
+
+    dtype = np.dtype(args.dtype)
+    for size in args.sizes:
+        tiles = make_tiles(size, args.tile, args.channels)
+        render = (tiles, (args.tile, args.tile), (0, 0), (size, size))
+        band_height = get_band_height(size, dtype)
+        mpix = size * size / 1e6
+
+        whole = best_time(args.repeat, *render, dtype=dtype)
+        banded = best_time(args.repeat, *render, dtype=dtype,
+                           band_height=band_height)
+
+        print(f'{size}x{size} {args.channels} channels {dtype}: '
+              f'whole {mpix / whole:.1f} Mpx/s, '
+              f'bands of {band_height} rows {mpix / banded:.1f} Mpx/s, '
+              f'speedup {whole / banded:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
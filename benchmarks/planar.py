@@ -0,0 +1,73 @@
+''' Compare interleaved and planar composite_channels throughput
+
+Usage: python benchmarks/planar.py [--sizes 1024 4096] [--channels 4]
+                                   [--dtype float32]
+
+Both layouts render with the same working precision, the default of
+composite_channels unless --dtype is given.
+'''
+
+import argparse
+import time
+import numpy as np
+from minerva_lib.render import composite_channels
+from minerva_lib.workspace import Workspace
+
+
+def make_channels(size, channels):
+    ''' Random uint16 channels of a square image of _size_ '''
+
+    rng = np.random.default_rng(0)
+    return [{
+        'image': rng.integers(0, 65535, (size, size), dtype=np.uint16),
+        'color': rng.random(3),
+        'min': 0.1,
+        'max': 0.9
+    } for _ in range(channels)]
+
+
+def best_time(repeat, channels, **kwargs):
+    ''' Best wall time of _repeat_ renders after one warm up render '''
+
+    composite_channels(channels, **kwargs)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        composite_channels(channels, **kwargs)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1024, 4096])
+    parser.add_argument('--channels', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--dtype', choices=['float32', 'float64'])
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        channels = make_channels(size, args.channels)
+        mpix = size * size / 1e6
+
+        for use_lut in (False, True):
+            for as_uint8 in (False, True):
+                options = {
+                    'use_lut': use_lut,
+                    'as_uint8': as_uint8,
+                    'workspace': Workspace(),
+                    'dtype': args.dtype
+                }
+                interleaved = best_time(args.repeat, channels, **options)
+                planar = best_time(args.repeat, channels, planar=True,
+                                   **options)
+
+                print(f'{size}x{size} {args.channels} channels '
+                      f'dtype={args.dtype} lut={use_lut} uint8={as_uint8}: '
+                      f'interleaved {mpix / interleaved:.1f} Mpx/s, '
+                      f'planar {mpix / planar:.1f} Mpx/s, '
+                      f'speedup {interleaved / planar:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+import asyncio
+import numpy as np
+from .render import composite_tile, gamma_correct, select_grids
+from .stats import RENDER
+from .workspace import get_buffer, get_luts
+
+
+async def composite_subtiles_async(load_tile, channels, tile_shape,
+                                   output_origin, output_shape, level=0,
+                                   concurrency=8, target_gamma=2.2,
+                                   use_lut=False, dtype=np.float64,
+                                   as_uint8=False, out=None, workspace=None,
+                                   stats=None):
+    '''Fetches and composites tiles concurrently within an event loop.
+
+    Every tile needed for the output image is requested from the
+    coroutine _load_tile_, with at most _concurrency_ requests pending at
+    once. Each tile is composited and freed as soon as it arrives, while
+    the other requests wait on the network, and the image is gamma
+    corrected once all tiles are composited.
+
+    Args:
+        load_tile: Coroutine function returning the 2D numpy image of a
+            tile, given integer channel index, integer level and tuple of
+            integer y, x grid reference.
+        channels: List of dicts of rendering settings, one for each
+            channel index passed to _load_tile_, as described for
+            `render_mosaic`.
+        tile_shape: Tuple of integer height, width of one tile.
+        output_origin: Tuple of integer y, x origin of output image.
+        output_shape: Tuple of integer height, width of output image.
+        level: Integer pyramid level of the tiles. Defaults to 0.
+        concurrency: Integer maximum number of pending tile requests.
+        target_gamma: Gamma of expected output device. Defaults to 2.2.
+        use_lut: Render uint8 and uint16 tiles through lookup tables.
+        dtype: Floating point working precision. Defaults to float64.
+        as_uint8: Render a uint8 image rather than a float image.
+        out: Optional output numpy array in which to place the result.
+        workspace: Optional `Workspace` providing scratch buffers and
+            caching lookup tables.
+        stats: Optional `TileStatsIndex` of the channels at _level_.
+            Tiles it shows to be empty or saturated are never requested.
+
+    Returns:
+        An image as returned by `composite_subtiles`.
+    '''
+
+    output_h, output_w = output_shape
+    shape_color = (output_h, output_w, 3)
+
+    # Final buffer for blending
+    if as_uint8:
+        buffer = get_buffer(workspace, 'accumulator', shape_color, dtype)
+    elif out is None:
+        buffer = np.empty(shape_color, dtype=dtype)
+    else:
+        buffer = out
+    buffer.fill(0)
+
+    # Lookup tables for integer tiles
+    luts = None
+    if use_lut:
+        luts = get_luts(workspace)
+
+    async def fetch(tile):
+        tile['image'] = await load_tile(tile['channel'], level,
+                                        tile['grid'])
+        return tile
+
+    def composite_done(done):
+        for task in done:
+            composite_tile(buffer, task.result(), tile_shape, output_origin,
+                           output_shape, luts=luts, dtype=dtype,
+                           workspace=workspace)
+
+    # Only pending requests are kept, so finished tiles are freed
+    pending = set()
+    try:
+        for grid in select_grids(tile_shape, output_origin, output_shape):
+            for index, channel in enumerate(channels):
+                tile = {
+                    'channel': index,
+                    'level': level,
+                    'grid': grid,
+                    'image': None,
+                    'color': channel['color'],
+                    'min': channel['min'],
+                    'max': channel['max']
+                }
+
+                # Tiles that are empty or saturated need no request
+                if stats is not None and stats.classify(
+                        index, level, grid, channel['min'],
+                        channel['max']) != RENDER:
+                    composite_tile(buffer, tile, tile_shape, output_origin,
+                                   output_shape, luts=luts, dtype=dtype,
+                                   workspace=workspace, stats=stats)
+                    continue
+
+                # Composite a tile whenever a request slot is needed
+                if len(pending) >= concurrency:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED)
+                    composite_done(done)
+                pending.add(asyncio.ensure_future(fetch(tile)))
+
+        # Composite each remaining tile as its request completes
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED)
+            composite_done(done)
+    finally:
+        for task in pending:
+            task.cancel()
+
+    # Gamma correct the image within 0, 1 or from 0 to 255
+    if as_uint8 and out is None:
+        out = np.empty(shape_color, dtype=np.uint8)
+    return gamma_correct(buffer, target_gamma, as_uint8, out=out,
+                         workspace=workspace)
@@ -0,0 +1,149 @@
+import os
+import warnings
+import collections
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Environment variable naming the default backend
+BACKEND_ENV = 'MINERVA_BACKEND'
+
+# Kernels that render functions dispatch through a backend
+Backend = collections.namedtuple('Backend', ['name', 'composite_channel',
+                                             'gamma_correct'])
+
+_backends = {}
+
+
+def register_backend(name, composite_channel, gamma_correct):
+    '''Registers the kernels of a backend under _name_.
+
+    Args:
+        name: String naming the backend.
+        composite_channel: Callable adding one normalized, colorized
+            channel to an RGB float image in place, with the arguments
+            out, image, color, range_min, range_max, dtype and workspace.
+        gamma_correct: Callable with the arguments and result of
+            `render.gamma_correct`.
+
+    Returns:
+        The registered `Backend`.
+    '''
+
+    backend = Backend(name, composite_channel, gamma_correct)
+    _backends[name] = backend
+    return backend
+
+
+def unregister_backend(name):
+    '''Removes the backend registered under _name_.
+
+    Args:
+        name: String naming a registered backend.
+
+    Raises:
+        ValueError: No backend is registered under _name_.
+    '''
+
+    try:
+        del _backends[name]
+    except KeyError:
+        raise ValueError('Unknown backend {}'.format(name)) from None
+
+
+def get_backend(backend=None):
+    '''Returns a registered backend.
+
+    The `numpy` backend is registered by `minerva_lib.render`, and the
+    `numba` backend is registered if numba can be imported.
+
+    Args:
+        backend: Optional `Backend` or string naming a registered backend.
+            By default, the backend named by the `MINERVA_BACKEND`
+            environment variable, or else `numpy`. If the environment
+            names a backend that is not registered, such as `numba`
+            without numba installed, `numpy` is used with a warning.
+
+    Returns:
+        A `Backend`.
+
+    Raises:
+        ValueError: _backend_ names no registered backend.
+    '''
+
+    if isinstance(backend, Backend):
+        return backend
+    if backend is None:
+        backend = os.environ.get(BACKEND_ENV) or 'numpy'
+        if backend not in _backends:
+            warnings.warn('Backend {} from {} is unavailable, using numpy'
+                          .format(backend, BACKEND_ENV), RuntimeWarning)
+            backend = 'numpy'
+
+    try:
+        return _backends[backend]
+    except KeyError:
+        raise ValueError('Unknown backend {}'.format(backend)) from None
+
+
+def list_backends():
+    '''Returns the sorted names of all registered backends.'''
+
+    return sorted(_backends)
+
+
+if numba is not None:
+
+    @numba.njit(cache=True, nogil=True)
+    def _composite_kernel(out, image, scale, offset, color):
+        for y in range(image.shape[0]):
+            for x in range(image.shape[1]):
+                value = min(max(image[y, x] * scale + offset, 0.0), 1.0)
+                for i in range(3):
+                    out[y, x, i] += value * color[i]
+
+    @numba.njit(cache=True, nogil=True)
+    def _gamma_kernel(image, out, inverse_gamma, scale):
+        for y in range(image.shape[0]):
+            for x in range(image.shape[1]):
+                for i in range(image.shape[2]):
+                    value = min(max(image[y, x, i], 0.0), 1.0)
+                    out[y, x, i] = scale * value ** inverse_gamma
+
+    def _composite_channel_numba(out, image, color, range_min, range_max,
+                                 dtype=None, workspace=None):
+        ''' Rescale, clip, colorize and add _image_ in one pass '''
+
+        kind = image.dtype.kind
+        if kind not in 'uf' or image.ndim != 2 or range_min >= range_max:
+            return get_backend('numpy').composite_channel(
+                out, image, color, range_min, range_max, dtype, workspace)
+
+        # Fold the conversion of unsigned integers into the scale
+        i_max = np.iinfo(image.dtype).max if kind == 'u' else 1
+        scale = 1 / (float(range_max - range_min) * i_max)
+        offset = -float(range_min) / float(range_max - range_min)
+        color = np.asarray(color, dtype=out.dtype)
+
+        _composite_kernel(out, image, out.dtype.type(scale),
+                          out.dtype.type(offset), color)
+        return out
+
+    def _gamma_correct_numba(image, target_gamma=2.2, as_uint8=False,
+                             out=None, workspace=None):
+        ''' Clip and gamma correct _image_ in one pass '''
+
+        if out is None:
+            out = np.empty(image.shape, np.uint8) if as_uint8 else image
+        if image.ndim != 3:
+            return get_backend('numpy').gamma_correct(
+                image, target_gamma, as_uint8, out, workspace)
+
+        scale = 255.0 if as_uint8 else 1.0
+        _gamma_kernel(image, out, 1 / target_gamma, scale)
+        return out
+
+    register_backend('numba', _composite_channel_numba, _gamma_correct_numba)
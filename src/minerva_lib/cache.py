@@ -0,0 +1,134 @@
+import threading
+import collections
+import numpy as np
+from .render import as_float_image
+
+
+class TileCache:
+    ''' Normalized floating point images of recently rendered tiles
+
+    Interactive viewers composite the same tiles repeatedly with new
+    colors and ranges. Renderers given a cache convert each tile to a
+    float image within 0, 1 once, and later renders of the tile read
+    the converted image without loading or converting the tile again.
+
+    The least recently used tiles are evicted to keep the cached images
+    within _max_bytes_. A cache may be shared by concurrent renders.
+
+    Args:
+        max_bytes: Integer budget of bytes for all cached images.
+            Defaults to 256 MiB.
+        dtype: Floating point dtype of the cached images. Defaults to
+            float32.
+    '''
+
+    def __init__(self, max_bytes=2 ** 28, dtype=np.float32):
+        self.max_bytes = int(max_bytes)
+        self.dtype = np.dtype(dtype)
+        self._images = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+
+    @staticmethod
+    def key(tile):
+        ''' Return the key identifying the image of one tile
+
+        Args:
+            tile: Dict of one tile with a hashable `source` naming the
+                image the tile belongs to, an integer `channel` index and
+                optionally an integer pyramid `level`.
+
+        Returns:
+            Tuple of source, integer channel, integer level and tuple of
+            integer y, x grid reference.
+
+        Raises:
+            ValueError: The tile has no source, so tiles of different
+                images could share its key.
+        '''
+
+        if tile.get('source') is None:
+            raise ValueError('Cached tiles must name their source')
+
+        grid = tile['grid']
+        return (tile['source'], int(tile['channel']),
+                int(tile.get('level', 0)), (int(grid[0]), int(grid[1])))
+
+    def get(self, key):
+        ''' Return the cached image for _key_, marking it recently used
+
+        Args:
+            key: Tile key from `key`.
+
+        Returns:
+            A read-only float numpy array, or None if _key_ is not cached.
+        '''
+
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+            return image
+
+    def load(self, key, image):
+        ''' Return the cached image for _key_, converting _image_ if needed
+
+        Args:
+            key: Tile key from `key`.
+            image: Numpy 2D image data of the full tile, or a callable
+                returning it, called only if _key_ is not cached.
+
+        Returns:
+            A read-only float numpy array of the cache dtype with values
+            within 0, 1 for unsigned integer tiles.
+        '''
+
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        if callable(image):
+            image = image()
+        f_image = as_float_image(image, self.dtype)
+        if f_image is image:
+            f_image = image.view()
+        f_image.flags.writeable = False
+
+        self.add(key, f_image)
+        return f_image
+
+    def add(self, key, f_image):
+        ''' Cache a normalized image, evicting least recently used images
+
+        Images larger than the whole budget are not cached.
+
+        Args:
+            key: Tile key from `key`.
+            f_image: Float numpy array of the normalized tile.
+        '''
+
+        if f_image.nbytes > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._images.pop(key, None)
+            if old is not None:
+                self.nbytes -= old.nbytes
+            self._images[key] = f_image
+            self.nbytes += f_image.nbytes
+
+            while self.nbytes > self.max_bytes:
+                self.nbytes -= self._images.popitem(last=False)[1].nbytes
+
+    def clear(self):
+        ''' Release all cached images '''
+
+        with self._lock:
+            self._images.clear()
+            self.nbytes = 0
+
+    def __len__(self):
+        return len(self._images)
+
+    def __contains__(self, key):
+        return key in self._images
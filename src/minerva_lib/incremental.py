@@ -0,0 +1,331 @@
+import functools
+import numpy as np
+from .render import (as_float_image, composite_subtiles, composite_tile,
+                     gamma_correct, select_grids)
+from .workspace import Workspace
+
+
+class IncrementalRenderer:
+    ''' Output image that re-renders only the channels that change
+
+    The linear contribution of every channel to one output image is kept,
+    along with their sum. Changing the settings of one channel subtracts
+    its old contribution from the sum, renders and adds the new one, and
+    then reapplies only the final clip and gamma correction, so the cost
+    of an update does not grow with the number of channels.
+
+    The tiles of each channel are loaded once and kept, converted to
+    float images of _dtype_ unless _use_lut_ is set, so updates neither
+    load nor convert tiles.
+
+    Repeated updates accumulate rounding error in the sum, which `resync`
+    removes by summing the kept contributions again.
+
+    Args:
+        tile_shape: Tuple of integer height, width of one tile.
+        output_origin: Tuple of integer y, x origin of output image.
+        output_shape: Tuple of integer height, width of output image.
+        target_gamma: Gamma of expected output device. Defaults to 2.2.
+        use_lut: Render uint8 and uint16 tiles through lookup tables.
+        dtype: Floating point working precision. Defaults to float64.
+        as_uint8: Render a uint8 image rather than a float image.
+        workspace: Optional `Workspace` providing scratch buffers and
+            caching lookup tables.
+    '''
+
+    def __init__(self, tile_shape, output_origin, output_shape,
+                 target_gamma=2.2, use_lut=False, dtype=np.float64,
+                 as_uint8=False, workspace=None):
+        self.tile_shape = tuple(tile_shape)
+        self.output_origin = tuple(output_origin)
+        self.output_shape = tuple(output_shape)
+        self.target_gamma = target_gamma
+        self.use_lut = use_lut
+        self.dtype = np.dtype(dtype)
+        self.as_uint8 = as_uint8
+        self.workspace = Workspace() if workspace is None else workspace
+
+        shape_color = self.output_shape + (3,)
+        self._sum = np.zeros(shape_color, dtype=self.dtype)
+        self._channels = {}
+
+    def _keep_image(self, image):
+        ''' Load the image of a tile and prepare it for repeated renders '''
+
+        if callable(image):
+            image = image()
+        if self.use_lut:
+            return image
+        return as_float_image(image, self.dtype)
+
+    def _render_channel(self, channel):
+        ''' Render the contribution of one channel in place '''
+
+        contribution = channel['contribution']
+        contribution.fill(0)
+
+        luts = self.workspace.luts if self.use_lut else None
+        for grid, image in channel['tiles']:
+            tile = dict(channel['settings'], grid=grid, image=image)
+            composite_tile(contribution, tile, self.tile_shape,
+                           self.output_origin, self.output_shape,
+                           luts=luts, dtype=self.dtype,
+                           workspace=self.workspace)
+
+    def set_channel(self, index, tiles, color, range_min, range_max):
+        ''' Render a channel from its tiles and add it to the output
+
+        Args:
+            index: Hashable channel identifier.
+            tiles: Iterator of dicts with the `grid` and `image` of each
+                tile of the channel needed for the output image, as
+                described for `composite_subtiles`.
+            color: Color as r, g, b float array within 0, 1.
+            range_min: Threshold range minimum, float within 0, 1.
+            range_max: Threshold range maximum, float within 0, 1.
+        '''
+
+        channel = self._channels.get(index)
+        if channel is None:
+            channel = {
+                'contribution': np.zeros_like(self._sum)
+            }
+            self._channels[index] = channel
+        else:
+            self._sum -= channel['contribution']
+
+        channel['tiles'] = [(tile['grid'], self._keep_image(tile['image']))
+                            for tile in tiles]
+        channel['settings'] = {
+            'color': color,
+            'min': range_min,
+            'max': range_max
+        }
+        self._render_channel(channel)
+        self._sum += channel['contribution']
+
+    def update_channel(self, index, color=None, range_min=None,
+                       range_max=None):
+        ''' Re-render a channel with new settings from its kept tiles
+
+        Args:
+            index: Identifier of a channel added by `set_channel`.
+            color: Optional new color as r, g, b float array within 0, 1.
+            range_min: Optional new threshold range minimum.
+            range_max: Optional new threshold range maximum.
+        '''
+
+        channel = self._channels[index]
+        settings = channel['settings']
+        if color is not None:
+            settings['color'] = color
+        if range_min is not None:
+            settings['min'] = range_min
+        if range_max is not None:
+            settings['max'] = range_max
+
+        self._sum -= channel['contribution']
+        self._render_channel(channel)
+        self._sum += channel['contribution']
+
+    def remove_channel(self, index):
+        ''' Subtract a channel from the output and forget it
+
+        Args:
+            index: Identifier of a channel added by `set_channel`.
+        '''
+
+        channel = self._channels.pop(index)
+        self._sum -= channel['contribution']
+
+    def resync(self):
+        ''' Sum all kept channel contributions again '''
+
+        self._sum.fill(0)
+        for channel in self._channels.values():
+            self._sum += channel['contribution']
+
+    def render(self, out=None):
+        ''' Clip and gamma correct the sum of all channels
+
+        Args:
+            out: Optional output numpy array in which to place the result.
+
+        Returns:
+            An image as returned by `composite_subtiles`.
+            If an output array is specified, a reference to _out_ is
+            returned.
+        '''
+
+        # Gamma correction overwrites its input, so work on a copy
+        display = self.workspace.empty('display', self._sum.shape,
+                                       self.dtype)
+        np.copyto(display, self._sum)
+
+        if out is None and not self.as_uint8:
+            out = np.empty_like(display)
+        return gamma_correct(display, self.target_gamma, self.as_uint8,
+                             out=out, workspace=self.workspace)
+
+    def __len__(self):
+        return len(self._channels)
+
+    def __contains__(self, index):
+        return index in self._channels
+
+
+def get_exposed_regions(output_origin, output_shape, frame_origin,
+                        frame_shape):
+    '''Splits an output image into the part shared with an earlier frame
+    and the strips not covered by that frame.
+
+    Args:
+        output_origin: Tuple of integer y, x origin of output image.
+        output_shape: Tuple of integer height, width of output image.
+        frame_origin: Tuple of integer y, x origin of earlier frame.
+        frame_shape: Tuple of integer height, width of earlier frame.
+
+    Returns:
+        Tuple of the overlap as a tuple of integer y, x origin and tuple
+        of integer height, width shape, or None if the images are
+        disjoint, and a list of such tuples for each exposed strip.
+    '''
+
+    (y_0, x_0), (h, w) = output_origin, output_shape
+    y_1, x_1 = y_0 + h, x_0 + w
+    o_y0 = max(y_0, frame_origin[0])
+    o_x0 = max(x_0, frame_origin[1])
+    o_y1 = min(y_1, frame_origin[0] + frame_shape[0])
+    o_x1 = min(x_1, frame_origin[1] + frame_shape[1])
+
+    if o_y0 >= o_y1 or o_x0 >= o_x1:
+        return None, [(tuple(output_origin), tuple(output_shape))]
+
+    # Full width strips above and below, then strips beside the overlap
+    strips = [
+        ((y_0, x_0), (o_y0 - y_0, w)),
+        ((o_y1, x_0), (y_1 - o_y1, w)),
+        ((o_y0, x_0), (o_y1 - o_y0, o_x0 - x_0)),
+        ((o_y0, o_x1), (o_y1 - o_y0, x_1 - o_x1))
+    ]
+    overlap = ((o_y0, o_x0), (o_y1 - o_y0, o_x1 - o_x0))
+    return overlap, [(origin, shape) for origin, shape in strips
+                     if shape[0] > 0 and shape[1] > 0]
+
+
+class ViewportRenderer:
+    ''' Viewer that reuses the last frame when panning
+
+    Each frame is kept after rendering. A later frame at the same pyramid
+    level with the same channel settings copies the region it shares with
+    the last frame and composites only the strips newly exposed by the
+    pan, loading only the tiles those strips need.
+
+    Args:
+        load_tile: Callable returning the 2D numpy image of a tile, given
+            integer channel index, integer level and tuple of integer
+            y, x grid reference.
+        channels: List of dicts of rendering settings, one for each
+            channel index passed to _load_tile_, as described for
+            `render_mosaic`.
+        tile_shape: Tuple of integer height, width of one tile.
+        target_gamma: Gamma of expected output device. Defaults to 2.2.
+        use_lut: Render uint8 and uint16 tiles through lookup tables.
+        dtype: Floating point working precision. Defaults to float64.
+        as_uint8: Render uint8 images rather than float images.
+        workspace: Optional `Workspace` providing scratch buffers and
+            caching lookup tables.
+        tile_cache: Optional `TileCache` keeping the normalized images of
+            loaded tiles, with _load_tile_ as their source, so frames
+            rendered with new channel settings do not load them again.
+    '''
+
+    def __init__(self, load_tile, channels, tile_shape, target_gamma=2.2,
+                 use_lut=False, dtype=np.float64, as_uint8=False,
+                 workspace=None, tile_cache=None):
+        self.load_tile = load_tile
+        self.tile_shape = tuple(tile_shape)
+        self.target_gamma = target_gamma
+        self.use_lut = use_lut
+        self.dtype = np.dtype(dtype)
+        self.as_uint8 = as_uint8
+        self.workspace = Workspace() if workspace is None else workspace
+        self.tile_cache = tile_cache
+        self.set_channels(channels)
+
+    def set_channels(self, channels):
+        ''' Change the channel settings, invalidating the last frame
+
+        Args:
+            channels: List of dicts of channel rendering settings.
+        '''
+
+        self.channels = channels
+        self._frame = None
+
+    def _render_region(self, out, origin, shape, level):
+        ''' Composite all channels of one region of a frame into _out_ '''
+
+        tiles = ({
+            'source': self.load_tile,
+            'channel': index,
+            'level': level,
+            'grid': grid,
+            'image': functools.partial(self.load_tile, index, level, grid),
+            'color': channel['color'],
+            'min': channel['min'],
+            'max': channel['max']
+        } for grid in select_grids(self.tile_shape, origin, shape)
+            for index, channel in enumerate(self.channels))
+
+        composite_subtiles(tiles, self.tile_shape, origin, shape,
+                           self.target_gamma, self.use_lut, self.dtype,
+                           self.as_uint8, out=out, workspace=self.workspace,
+                           tile_cache=self.tile_cache)
+
+    def render(self, output_origin, output_shape, level=0, out=None):
+        '''Renders one frame, reusing the overlap with the last frame.
+
+        Args:
+            output_origin: Tuple of integer y, x origin of output image.
+            output_shape: Tuple of integer height, width of output image.
+            level: Integer pyramid level of the tiles. Defaults to 0.
+            out: Optional output numpy array in which to place the result.
+
+        Returns:
+            An image as returned by `composite_subtiles`.
+            If an output array is specified, a reference to _out_ is
+            returned.
+        '''
+
+        output_origin = tuple(int(v) for v in output_origin)
+        output_shape = tuple(int(v) for v in output_shape)
+        out_dtype = np.uint8 if self.as_uint8 else self.dtype
+        frame = np.empty(output_shape + (3,), dtype=out_dtype)
+
+        overlap, strips = None, [(output_origin, output_shape)]
+        last = self._frame
+        if last is not None and last[0] == level:
+            overlap, strips = get_exposed_regions(output_origin,
+                                                  output_shape, *last[1:3])
+
+        # Copy the region shared with the last frame
+        if overlap is not None:
+            (y, x), (h, w) = overlap
+            l_y, l_x = y - last[1][0], x - last[1][1]
+            n_y, n_x = y - output_origin[0], x - output_origin[1]
+            frame[n_y:n_y + h, n_x:n_x + w] = last[3][l_y:l_y + h,
+                                                      l_x:l_x + w]
+
+        # Render only the newly exposed strips
+        for (y, x), (h, w) in strips:
+            n_y, n_x = y - output_origin[0], x - output_origin[1]
+            region = frame[n_y:n_y + h, n_x:n_x + w]
+            self._render_region(region, (y, x), (h, w), level)
+
+        self._frame = (level, output_origin, output_shape, frame)
+
+        if out is None:
+            return frame.copy()
+        np.copyto(out, frame)
+        return out
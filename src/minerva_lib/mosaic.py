@@ -0,0 +1,221 @@
+import concurrent.futures
+import numpy as np
+from .render import composite_subtiles, select_grids
+from .workspace import Workspace
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+# Workspace reused by all bands rendered in one worker process
+_process_workspace = None
+
+
+class SharedArray:
+    ''' Numpy array in shared memory that pickles as a handle
+
+    Pickling a shared array sends only the name, shape and dtype of its
+    shared memory block, so another process attaches to the same memory
+    instead of receiving a copy of the data.
+
+    Args:
+        shape: Tuple of integer dimensions of the array.
+        dtype: Numpy dtype of the array.
+        name: Name of an existing shared memory block to attach to.
+            By default, a new block is created.
+
+    Raises:
+        RuntimeError: Shared memory needs Python 3.8 or later.
+    '''
+
+    def __init__(self, shape, dtype, name=None):
+        if shared_memory is None:
+            raise RuntimeError('Shared memory needs Python 3.8 or later')
+
+        self.shape = tuple(int(d) for d in shape)
+        self.dtype = np.dtype(dtype)
+
+        if name is None:
+            size = max(1, int(np.prod(self.shape)) * self.dtype.itemsize)
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+
+        self.array = np.ndarray(self.shape, self.dtype, buffer=self._shm.buf)
+
+    @property
+    def name(self):
+        ''' Name of the shared memory block '''
+
+        return self._shm.name
+
+    def __reduce__(self):
+        return (SharedArray, (self.shape, self.dtype, self.name))
+
+    def close(self):
+        ''' Detach this process from the shared memory block '''
+
+        self.array = None
+        self._shm.close()
+
+    def unlink(self):
+        ''' Free the shared memory block once all processes close it '''
+
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        self.unlink()
+
+
+def get_tile_bands(tile_shape, output_origin, output_shape, band_tiles=1):
+    '''Splits the output image into bands of rows aligned to tile rows.
+
+    Args:
+        tile_shape: Tuple of integer height, width of one tile.
+        output_origin: Tuple of integer y, x origin of output image.
+        output_shape: Tuple of integer height, width of output image.
+        band_tiles: Integer number of tile rows in each band.
+
+    Returns:
+        List of tuples of integer start, end output image rows.
+    '''
+
+    band_height = tile_shape[0] * band_tiles
+    origin_y = output_origin[0]
+    output_h = output_shape[0]
+
+    # Band boundaries fall on multiples of the band height in the image
+    first = origin_y - origin_y % band_height
+    ends = range(first + band_height, origin_y + output_h, band_height)
+    starts = [origin_y] + list(ends)
+    ends = list(ends) + [origin_y + output_h]
+
+    return [(y_0 - origin_y, y_1 - origin_y) for y_0, y_1 in zip(starts, ends)]
+
+
+def render_band(out, load_tile, channels, level, tile_shape, output_origin,
+                output_shape, rows, options):
+    '''Renders one band of output rows into a shared output array.
+
+    Args:
+        out: `SharedArray` holding the whole output image.
+        load_tile: Callable returning the 2D image of a tile, given
+            integer channel index, integer level and y, x grid reference.
+        channels: List of dicts of channel rendering settings as
+            described for `render_mosaic`.
+        level: Integer pyramid level of the tiles.
+        tile_shape: Tuple of integer height, width of one tile.
+        output_origin: Tuple of integer y, x origin of output image.
+        output_shape: Tuple of integer height, width of output image.
+        rows: Tuple of integer start, end output image rows of the band.
+        options: Dict of keyword arguments for `composite_subtiles`.
+    '''
+
+    global _process_workspace
+    if _process_workspace is None:
+        _process_workspace = Workspace()
+
+    y_0, y_1 = rows
+    band_origin = (output_origin[0] + y_0, output_origin[1])
+    band_shape = (y_1 - y_0, output_shape[1])
+
+    tiles = ({
+        'grid': grid,
+        'image': load_tile(index, level, grid),
+        'color': channel['color'],
+        'min': channel['min'],
+        'max': channel['max']
+    } for grid in select_grids(tile_shape, band_origin, band_shape)
+        for index, channel in enumerate(channels))
+
+    try:
+        composite_subtiles(tiles, tile_shape, band_origin, band_shape,
+                           out=out.array[y_0:y_1],
+                           workspace=_process_workspace, **options)
+    finally:
+        out.close()
+
+
+def render_mosaic(load_tile, channels, tile_shape, output_origin,
+                  output_shape, level=0, target_gamma=2.2, use_lut=False,
+                  dtype=np.float32, as_uint8=False, out=None,
+                  processes=None, band_tiles=1):
+    '''Renders a large output image on a pool of worker processes.
+
+    The output image is split into bands of tile rows. Each worker process
+    loads the tiles of its band itself and composites them directly into
+    an output array in shared memory, so neither tiles nor rendered pixels
+    are pickled between processes.
+
+    Args:
+        load_tile: Picklable callable returning the 2D numpy image of a
+            tile, given integer channel index, integer level and tuple of
+            integer y, x grid reference.
+        channels: List of dicts of rendering settings, one for each
+            channel index passed to _load_tile_:
+            {
+                color: Color as r, g, b float array within 0, 1
+                min: Threshold range minimum, float within 0, 1
+                max: Threshold range maximum, float within 0, 1
+            }
+        tile_shape: Tuple of integer height, width of one tile.
+        output_origin: Tuple of integer y, x origin of output image.
+        output_shape: Tuple of integer height, width of output image.
+        level: Integer pyramid level of the tiles. Defaults to 0.
+        target_gamma: Gamma of expected output device. Defaults to 2.2.
+        use_lut: Render uint8 and uint16 tiles through lookup tables.
+        dtype: Floating point working precision. Defaults to float32.
+        as_uint8: Render a uint8 image rather than a float image.
+        out: Optional `SharedArray` in which to place the result. By
+            default, the result is rendered into a temporary shared
+            memory block and copied out of it before the block is freed,
+            so the output briefly needs twice its size in memory. Pass
+            _out_ to render large images without that copy.
+        processes: Optional integer number of worker processes.
+        band_tiles: Integer number of tile rows rendered by each task.
+
+    Returns:
+        A numpy array with the rendered image, or _out_ if given.
+    '''
+
+    out_dtype = np.uint8 if as_uint8 else dtype
+    shape_color = tuple(output_shape) + (3,)
+
+    if out is None:
+        shared = SharedArray(shape_color, out_dtype)
+    else:
+        shared = out
+        if shared.shape != shape_color or shared.dtype != out_dtype:
+            raise ValueError('Output must match the output shape and dtype')
+
+    options = {
+        'target_gamma': target_gamma,
+        'use_lut': use_lut,
+        'dtype': dtype,
+        'as_uint8': as_uint8
+    }
+    bands = get_tile_bands(tile_shape, output_origin, output_shape,
+                           band_tiles)
+
+    try:
+        with concurrent.futures.ProcessPoolExecutor(processes) as executor:
+            futures = [executor.submit(render_band, shared, load_tile,
+                                       channels, level, tile_shape,
+                                       output_origin, output_shape, rows,
+                                       options) for rows in bands]
+            for future in futures:
+                future.result()
+
+        if out is not None:
+            return out
+        # Shared memory is freed on return, so the result must be copied
+        return shared.array.copy()
+    finally:
+        if out is None:
+            shared.close()
+            shared.unlink()
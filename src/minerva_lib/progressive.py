@@ -0,0 +1,106 @@
+import functools
+import numpy as np
+from .render import (composite_subtiles, get_optimum_pyramid_level,
+                     scale_image_nearest_neighbor, select_grids,
+                     transform_coordinates_to_level)
+
+
+def get_level_region(output_origin, output_shape, image_shape, level):
+    '''Transforms a full resolution region to one pyramid level.
+
+    The region is kept at least one pixel in size and within the image
+    at the level.
+
+    Args:
+        output_origin: Tuple of integer y, x origin at full resolution.
+        output_shape: Tuple of integer height, width at full resolution.
+        image_shape: Tuple of integer height, width of full image.
+        level: Integer pyramid level.
+
+    Returns:
+        Tuple of integer y, x origin and tuple of integer height, width
+        shape of the region at _level_.
+    '''
+
+    level_shape = np.ceil(np.array(image_shape) / 2 ** level).astype(int)
+    origin = np.array(transform_coordinates_to_level(output_origin, level))
+    shape = np.array(transform_coordinates_to_level(output_shape, level))
+
+    origin = np.clip(origin, 0, level_shape - 1)
+    shape = np.clip(shape, 1, level_shape - origin)
+    return tuple(origin.tolist()), tuple(shape.tolist())
+
+
+def render_progressive(load_tile, channels, tile_shape, image_shape,
+                       level_count, output_origin, output_shape,
+                       output_size=None, preview_levels=2, target_gamma=2.2,
+                       use_lut=False, dtype=np.float32, as_uint8=False,
+                       workspace=None):
+    '''Renders an output image from coarse to fine pyramid levels.
+
+    The image is first rendered from a coarser level with few, small
+    tiles and upscaled to the output size, so a preview is ready quickly.
+    Each finer level is then rendered and yielded in turn, ending with
+    the level best matching _output_size_.
+
+    Args:
+        load_tile: Callable returning the 2D numpy image of a tile, given
+            integer channel index, integer level and tuple of integer
+            y, x grid reference.
+        channels: List of dicts of rendering settings, one for each
+            channel index passed to _load_tile_, as described for
+            `render_mosaic`.
+        tile_shape: Tuple of integer height, width of one tile.
+        image_shape: Tuple of integer height, width of full image.
+        level_count: Integer number of available pyramid levels.
+        output_origin: Tuple of integer y, x origin at full resolution.
+        output_shape: Tuple of integer height, width at full resolution.
+        output_size: Optional integer length of the longest dimension of
+            the displayed image of the region given by _output_origin_
+            and _output_shape_. Defaults to full resolution.
+        preview_levels: Integer number of levels coarser than the final
+            level to render first. Defaults to 2.
+        target_gamma: Gamma of expected output device. Defaults to 2.2.
+        use_lut: Render uint8 and uint16 tiles through lookup tables.
+        dtype: Floating point working precision. Defaults to float32.
+        as_uint8: Render uint8 images rather than float images.
+        workspace: Optional `Workspace` providing scratch buffers and
+            caching lookup tables.
+
+    Yields:
+        Tuples of integer pyramid level and image as returned by
+        `composite_subtiles`, all with the shape of the final level.
+    '''
+
+    if output_size is None:
+        output_size = max(output_shape)
+
+    # The displayed size is of the viewport, not of the whole image
+    final = get_optimum_pyramid_level(output_shape, level_count,
+                                      output_size, True)
+    first = min(final + preview_levels, level_count - 1)
+    final_shape = get_level_region(output_origin, output_shape,
+                                   image_shape, final)[1]
+
+    for level in range(first, final - 1, -1):
+        origin, shape = get_level_region(output_origin, output_shape,
+                                         image_shape, level)
+        tiles = ({
+            'grid': grid,
+            'image': functools.partial(load_tile, index, level, grid),
+            'color': channel['color'],
+            'min': channel['min'],
+            'max': channel['max']
+        } for grid in select_grids(tile_shape, origin, shape)
+            for index, channel in enumerate(channels))
+
+        image = composite_subtiles(tiles, tile_shape, origin, shape,
+                                   target_gamma, use_lut, dtype, as_uint8,
+                                   workspace=workspace)
+
+        # Upscale coarser levels to the final shape
+        if shape != final_shape:
+            factors = [f / s for f, s in zip(final_shape, shape)]
+            image = scale_image_nearest_neighbor(image, factors)
+
+        yield level, image
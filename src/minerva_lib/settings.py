@@ -0,0 +1,170 @@
+import numpy as np
+from .render import (as_float_image, build_channel_lut, colorize_channel,
+                     composite_channel_lut)
+from .workspace import get_buffer
+
+
+class ChannelSettings:
+    ''' Rendering coefficients of one channel, compiled by `RenderSettings`
+
+    The threshold range is folded into a scale and offset applied directly
+    to the raw pixel values, so integer images are converted, rescaled and
+    clipped in one multiply-add and one clip.
+
+    Args:
+        index: Integer channel index.
+        color: Color as r, g, b float array within 0, 1.
+        range_min: Threshold range minimum, float within 0, 1.
+        range_max: Threshold range maximum, float within 0, 1.
+        dtype: Floating point working precision. Defaults to float64.
+        use_lut: Render uint8 and uint16 images through lookup tables,
+            built on first use and kept with the settings.
+    '''
+
+    def __init__(self, index, color, range_min, range_max,
+                 dtype=np.float64, use_lut=False):
+        self.index = index
+        self.dtype = np.dtype(dtype)
+        self.color = np.array(color, dtype=self.dtype)
+        self.range_min = range_min
+        self.range_max = range_max
+        self.scale = 1 / float(range_max - range_min)
+        self.offset = -float(range_min) * self.scale
+        self.use_lut = use_lut
+        self.luts = {}
+
+    def get_lut(self, image_dtype):
+        ''' Return the lookup table for images of _image_dtype_
+
+        Args:
+            image_dtype: Numpy dtype of the images to render.
+
+        Returns:
+            A lookup table from `build_channel_lut`, or None if lookup
+            tables are not used for images of _image_dtype_.
+        '''
+
+        image_dtype = np.dtype(image_dtype)
+        if not self.use_lut or image_dtype.type not in (np.uint8, np.uint16):
+            return None
+
+        lut = self.luts.get(image_dtype.str)
+        if lut is None:
+            lut = build_channel_lut(image_dtype, self.color, self.range_min,
+                                    self.range_max, self.dtype)
+            self.luts[image_dtype.str] = lut
+        return lut
+
+    def normalize(self, image, workspace=None):
+        ''' Rescale _image_ to a float between 0 and 1
+
+        Args:
+            image: Numpy array of image to rescale.
+            workspace: Optional `Workspace` providing the result buffer.
+
+        Returns:
+            A float numpy array of the working precision.
+        '''
+
+        f_image = get_buffer(workspace, 'channel', image.shape, self.dtype)
+        kind = image.dtype.kind
+
+        # Fold the conversion of unsigned integers into the scale
+        if kind == 'u':
+            scale = self.scale / np.iinfo(image.dtype).max
+            np.multiply(image, scale, out=f_image, dtype=self.dtype)
+        elif kind == 'f':
+            np.multiply(image, self.scale, out=f_image, dtype=self.dtype)
+        else:
+            as_float_image(image, out=f_image)
+            f_image *= self.scale
+
+        f_image += self.offset
+        return np.clip(f_image, 0, 1, out=f_image)
+
+    def composite(self, out, image, workspace=None):
+        ''' Render _image_ in pseudocolor and add it to _out_ in place
+
+        Args:
+            out: Numpy RGB array containing composition target image.
+            image: Numpy array of image to render and composite.
+            workspace: Optional `Workspace` providing scratch buffers.
+
+        Returns:
+            A reference to _out_.
+        '''
+
+        lut = self.get_lut(image.dtype)
+        if lut is not None:
+            return composite_channel_lut(out, image, lut, out, workspace)
+
+        f_image = self.normalize(image, workspace)
+        return colorize_channel(out, f_image, self.color, workspace)
+
+
+class RenderSettings:
+    ''' Channel rendering settings validated and compiled once
+
+    Compiled settings can be reused by every tile and every request that
+    shares them. Channels that cannot contribute to the output, because
+    their color is black or their range is empty, are dropped. Float
+    images are not limited to 0, 1, so channels with ranges above 1 are
+    kept.
+
+    Args:
+        channels: List of dicts of rendering settings, one per channel
+            index:
+            {
+                color: Color as r, g, b float array within 0, 1
+                min: Threshold range minimum, float within 0, 1
+                max: Threshold range maximum, float within 0, 1
+            }
+        dtype: Floating point working precision. Defaults to float64.
+        use_lut: Render uint8 and uint16 images through lookup tables.
+    '''
+
+    def __init__(self, channels, dtype=np.float64, use_lut=False):
+        self.dtype = np.dtype(dtype)
+        self.count = len(channels)
+        self.channels = {}
+
+        for index, channel in enumerate(channels):
+            color = np.array(channel['color'], dtype=np.float64)
+            range_min, range_max = channel['min'], channel['max']
+
+            if color.shape != (3,):
+                raise ValueError('Colors must have r, g, b components')
+            if not np.all(np.isfinite(color)) or np.any(color < 0):
+                raise ValueError('Colors must be finite and non-negative')
+            if not np.isfinite(range_min) or not np.isfinite(range_max):
+                raise ValueError('Ranges must be finite')
+            if range_min > range_max:
+                raise ValueError('Range minimum must not exceed maximum')
+
+            # Skip channels that cannot add to the output image
+            if not color.any() or range_min == range_max:
+                continue
+
+            self.channels[index] = ChannelSettings(index, color, range_min,
+                                                   range_max, dtype, use_lut)
+
+    def get(self, index):
+        ''' Return compiled settings for a channel index
+
+        Args:
+            index: Integer channel index.
+
+        Returns:
+            `ChannelSettings` for the channel, or None if the channel was
+            dropped for not contributing to the output.
+        '''
+
+        if index not in range(self.count):
+            raise KeyError('Unknown channel index {}'.format(index))
+        return self.channels.get(index)
+
+    def __len__(self):
+        return len(self.channels)
+
+    def __iter__(self):
+        return iter(self.channels.values())
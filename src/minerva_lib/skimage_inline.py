@@ -82,16 +82,26 @@ def dtype_limits(image, clip_negative=False):
 
 
 # skimage.exposure.exposure._assert_non_negative
-def _assert_non_negative(image):
+def _assert_non_negative(image, stats=None):
+
+    # minerva: unsigned and empty images need no scan, others need only
+    # the minimum
+    if image.dtype.kind in 'ub' or image.size == 0:
+        return
+    if stats is not None:
+        i_min = stats.get(image)[0]
+    else:
+        i_min = np.min(image)
 
-    if np.any(image < 0):
+    if i_min < 0:
         raise ValueError('Image Correction methods work correctly only on '
                          'images with non-negative values. Use '
                          'skimage.exposure.rescale_intensity.')
 
 
 # skimage.exposure.exposure.intensity_range
-def intensity_range(image, range_values='image', clip_negative=False):
+def intensity_range(image, range_values='image', clip_negative=False,
+                    stats=None):
     """Return image intensity range (min, max) based on desired value type.
     Parameters
     ----------
@@ -115,13 +125,21 @@ def intensity_range(image, range_values='image', clip_negative=False):
     clip_negative : bool
         If True, clip the negative range (i.e. return 0 for min intensity)
         even if the image dtype allows negative values.
+    stats : object, optional
+        Cache with a `get(image)` method returning the minimum and maximum
+        of an image, such as `minerva_lib.stats.IntensityStats`, answering
+        the 'image' range without scanning an image seen before. (minerva)
     """
     if range_values == 'dtype':
         range_values = image.dtype.type
 
     if range_values == 'image':
-        i_min = np.min(image)
-        i_max = np.max(image)
+        # minerva: extrema from the cache when one is given
+        if stats is not None:
+            i_min, i_max = stats.get(image)
+        else:
+            i_min = np.min(image)
+            i_max = np.max(image)
     elif range_values in DTYPE_RANGE:
         i_min, i_max = DTYPE_RANGE[range_values]
         if clip_negative:
@@ -131,8 +149,81 @@ def intensity_range(image, range_values='image', clip_negative=False):
     return i_min, i_max
 
 
+# minerva: converters resolved once per dtype pair and options
+_converters = {}
+
+
+def get_converter(dtype_in, dtype, force_copy=False, uniform=False):
+    """Return a function converting images of `dtype_in` to `dtype`.
+    The function takes an image and an optional `out` array, and matches
+    `convert`. It is built once for each pair of dtypes and options, so
+    repeated conversions skip the dtype checks of `convert`.
+    Unsigned integer to floating point conversions without precision
+    loss write directly into `out`.
+    Parameters
+    ----------
+    dtype_in : dtype
+        Data-type of the images to convert.
+    dtype : dtype
+        Target data-type, as for `convert`.
+    force_copy : bool, optional
+        Force a copy of the data, irrespective of its current dtype.
+    uniform : bool, optional
+        Uniformly quantize the floating point range to the integer range.
+    Returns
+    -------
+    converter : callable
+        Function of `image` and optional `out` returning the converted
+        image, or `out` if given.
+    """
+    dtypeobj_in = np.dtype(dtype_in)
+    type_out = dtype if isinstance(dtype, type) else np.dtype(dtype)
+    key = (dtypeobj_in.str, type_out, force_copy, uniform)
+
+    converter = _converters.get(key)
+    if converter is None:
+        converter = _build_converter(dtypeobj_in, dtype, type_out,
+                                     force_copy, uniform)
+        _converters[key] = converter
+    return converter
+
+
+def _build_converter(dtypeobj_in, dtype, type_out, force_copy, uniform):
+    # Images that need no conversion
+    if np.issubdtype(dtypeobj_in, type_out):
+        def same(image, out=None):
+            if out is not None:
+                np.copyto(out, image)
+                return out
+            return image.copy() if force_copy else image
+        return same
+
+    dtypeobj_out = np.dtype(dtype)
+    kind_in, kind_out = dtypeobj_in.kind, dtypeobj_out.kind
+
+    # Unsigned integers to floats that represent them exactly
+    if kind_in == 'u' and kind_out == 'f' \
+            and dtypeobj_in.itemsize < dtypeobj_out.itemsize:
+        scale = 1. / np.iinfo(dtypeobj_in).max
+
+        def unsigned_to_float(image, out=None):
+            if out is None:
+                out = np.empty(image.shape, dtypeobj_out)
+            return np.multiply(image, scale, out=out, dtype=dtypeobj_out,
+                               casting='unsafe')
+        return unsigned_to_float
+
+    def general(image, out=None):
+        result = _convert(image, dtype, force_copy, uniform)
+        if out is None:
+            return result
+        np.copyto(out, result)
+        return out
+    return general
+
+
 # skimage.util.dtype.convert
-def convert(image, dtype, force_copy=False, uniform=False):
+def convert(image, dtype, force_copy=False, uniform=False, out=None):
     """
     Convert an image to the requested data-type.
     Warnings are issued in case of precision loss, or when negative values
@@ -156,6 +247,8 @@ def convert(image, dtype, force_copy=False, uniform=False):
         By default (uniform=False) floating point values are scaled and
         rounded to the nearest integers, which minimizes back and forth
         conversion errors.
+    out : ndarray, optional
+        Array in which to place the result. (minerva)
     References
     ----------
     .. [1] DirectX data conversion rules.
@@ -167,6 +260,13 @@ def convert(image, dtype, force_copy=False, uniform=False):
     .. [4] Dirty Pixels. J. Blinn. In "Jim Blinn's corner: Dirty Pixels",
            pp 47-57. Morgan Kaufmann, 1998.
     """
+    # minerva: dispatch to a converter cached for the dtype pair
+    image = np.asarray(image)
+    converter = get_converter(image.dtype, dtype, force_copy, uniform)
+    return converter(image, out)
+
+
+def _convert(image, dtype, force_copy=False, uniform=False):
     image = np.asarray(image)
     dtypeobj_in = image.dtype
     dtypeobj_out = np.dtype(dtype)
@@ -428,8 +528,59 @@ def img_as_float(image, force_copy=False):
     return convert(image, np.floating, force_copy)
 
 
+# skimage.util.dtype.img_as_float32
+def img_as_float32(image, force_copy=False, out=None):
+    """Convert an image to single-precision (32-bit) floating point format.
+    Parameters
+    ----------
+    image : ndarray
+        Input image.
+    force_copy : bool, optional
+        Force a copy of the data, irrespective of its current dtype.
+    out : ndarray, optional
+        Float32 array in which to place the result. (minerva)
+    Returns
+    -------
+    out : ndarray of float32
+        Output image.
+    Notes
+    -----
+    The range of a floating point image is [0.0, 1.0] or [-1.0, 1.0] when
+    converting from unsigned or signed datatypes, respectively.
+    If the input image has a float type, intensity values are not modified
+    and can be outside the ranges [0.0, 1.0] or [-1.0, 1.0].
+    """
+    return convert(image, np.float32, force_copy, out=out)
+
+
+# skimage.util.dtype.img_as_float64
+def img_as_float64(image, force_copy=False, out=None):
+    """Convert an image to double-precision (64-bit) floating point format.
+    Parameters
+    ----------
+    image : ndarray
+        Input image.
+    force_copy : bool, optional
+        Force a copy of the data, irrespective of its current dtype.
+    out : ndarray, optional
+        Float64 array in which to place the result. (minerva)
+    Returns
+    -------
+    out : ndarray of float64
+        Output image.
+    Notes
+    -----
+    The range of a floating point image is [0.0, 1.0] or [-1.0, 1.0] when
+    converting from unsigned or signed datatypes, respectively.
+    If the input image has a float type, intensity values are not modified
+    and can be outside the ranges [0.0, 1.0] or [-1.0, 1.0].
+    """
+    return convert(image, np.float64, force_copy, out=out)
+
+
 # skimage.exposure.exposure.rescale_intensity
-def rescale_intensity(image, in_range='image', out_range='dtype'):
+def rescale_intensity(image, in_range='image', out_range='dtype', out=None,
+                      stats=None):
     """Return image after stretching or shrinking its intensity levels.
     The desired intensity range of the input and output, `in_range` and
     `out_range` respectively, are used to stretch or shrink the intensity range
@@ -450,11 +601,17 @@ def rescale_intensity(image, in_range='image', out_range='dtype'):
             in `DTYPE_RANGE`.
         2-tuple
             Use `range_values` as explicit min/max intensities.
+    out : array, optional
+        Floating point array in which to place the result. It may be `image`
+        itself to rescale in place. (minerva)
+    stats : object, optional
+        Cache of image extrema for an 'image' input range, as for
+        `intensity_range`. (minerva)
     Returns
     -------
     out : array
         Image array after rescaling its intensity. This image is the same dtype
-        as the input image.
+        as the input image, or a reference to `out` if given.
     See Also
     --------
     equalize_hist
@@ -488,17 +645,34 @@ def rescale_intensity(image, in_range='image', out_range='dtype'):
     """
     dtype = image.dtype.type
 
-    imin, imax = intensity_range(image, in_range)
+    imin, imax = intensity_range(image, in_range, stats=stats)
     omin, omax = intensity_range(image, out_range, clip_negative=(imin >= 0))
 
+    # minerva: keep the working precision of floating point images
+    if image.dtype.kind == 'f':
+        imin, imax, omin, omax = map(dtype, (imin, imax, omin, omax))
+
+    # minerva: fold the clip, offset and scale into one multiply-add, but
+    # keep the original clip of inverted input ranges
+    if imax > imin and (out is not None or image.dtype.kind == 'f'):
+        scale = float(omax - omin) / float(imax - imin)
+        offset = float(omin) - float(imin) * scale
+        out = np.multiply(image, scale, out=out)
+        out += offset
+        return np.clip(out, omin, omax, out=out)
+
     image = np.clip(image, imin, imax)
 
     image = (image - imin) / float(imax - imin)
-    return np.array(image * (omax - omin) + omin, dtype=dtype)
+    image = np.array(image * (omax - omin) + omin, dtype=dtype)
+    if out is None:
+        return image
+    out[...] = image
+    return out
 
 
 # skimage.exposure.exposure.adjust_gamma
-def adjust_gamma(image, gamma=1, gain=1):
+def adjust_gamma(image, gamma=1, gain=1, out=None, stats=None):
     """Performs Gamma Correction on the input image.
     Also known as Power Law Transform.
     This function transforms the input image pixelwise according to the
@@ -511,6 +685,16 @@ def adjust_gamma(image, gamma=1, gain=1):
         Non negative real number. Default value is 1.
     gain : float
         The constant multiplier. Default value is 1.
+    out : ndarray, optional
+        Array in which to place the result, which may be `image` itself
+        for a floating point image. An integer array receives the result
+        scaled to its dtype range, clipped and truncated, so a float
+        image within 0 to 1 is gamma corrected directly into uint8
+        display values. (minerva)
+    stats : object, optional
+        Cache of image extrema, as for `intensity_range`, answering the
+        check for negative values without scanning an image seen before.
+        (minerva)
     Returns
     -------
     out : ndarray
@@ -536,13 +720,42 @@ def adjust_gamma(image, gamma=1, gain=1):
     >>> image.mean() > gamma_corrected.mean()
     True
     """
-    _assert_non_negative(image)
+    _assert_non_negative(image, stats)
     dtype = image.dtype.type
 
     if gamma < 0:
         raise ValueError("Gamma should be a non-negative real number.")
 
-    scale = float(dtype_limits(image, True)[1] - dtype_limits(image, True)[0])
+    # minerva: look up the dtype limits once
+    imin, imax = dtype_limits(image, True)
+    scale = float(imax - imin)
+
+    # minerva: python scalars keep the working precision of the image
+    gamma, gain = float(gamma), float(gain)
+
+    # minerva: scale into integer outputs through one float result
+    if out is not None and out.dtype.kind in 'ui':
+        if scale != 1:
+            result = np.divide(image, scale)
+            np.power(result, gamma, out=result)
+        else:
+            result = np.power(image, gamma)
+        omax = np.iinfo(out.dtype).max
+        result *= gain * omax
+        np.clip(result, 0, omax, out=result)
+        np.copyto(out, result, casting='unsafe')
+        return out
+
+    # minerva: compute floating point results in place without temporaries
+    if out is not None or image.dtype.kind == 'f':
+        if scale != 1:
+            out = np.divide(image, scale, out=out)
+            out = np.power(out, gamma, out=out)
+        else:
+            out = np.power(image, gamma, out=out)
+        if scale * gain != 1:
+            out *= scale * gain
+        return out
 
     out = ((image / scale) ** gamma) * scale * gain
     return dtype(out)
@@ -0,0 +1,268 @@
+import weakref
+import collections
+import numpy as np
+from . import skimage_inline as ski
+
+# Tile statistics as intensities normalized within 0, 1
+TileStats = collections.namedtuple('TileStats', ['min', 'max', 'mean'])
+
+# How a tile contributes to an output image
+RENDER = 'render'
+SKIP = 'skip'
+SATURATED = 'saturated'
+
+
+# Bytes of an image reduced at once, small enough to stay in cache
+MINMAX_BLOCK = 2 ** 18
+
+
+def minmax(image):
+    '''Return the minimum and maximum of an image.
+
+    Images larger than the cache are reduced in blocks of rows along the
+    first axis, taking both extrema of each block while it is in cache,
+    so the image is read from memory only once. Smaller images are
+    reduced twice, since the second reduction reads from cache.
+
+    Args:
+        image: Numpy array of any shape.
+
+    Returns:
+        Tuple of the minimum and maximum values of _image_.
+    '''
+
+    if image.ndim == 0 or image.nbytes <= 2 * MINMAX_BLOCK:
+        return np.min(image), np.max(image)
+
+    step = max(1, MINMAX_BLOCK // max(1, image[0].nbytes))
+    i_min = i_max = None
+    for start in range(0, image.shape[0], step):
+        block = image[start:start + step]
+        b_min, b_max = np.min(block), np.max(block)
+        if i_min is None or b_min < i_min:
+            i_min = b_min
+        if i_max is None or b_max > i_max:
+            i_max = b_max
+    return i_min, i_max
+
+
+class IntensityStats:
+    ''' Cache of the minimum and maximum of each image
+
+    Entries are keyed by the identity of the image array and dropped when
+    the array is garbage collected. Images must not be modified while
+    cached, or `discard` must be called after modifying them. Views of an
+    array are distinct images, so cache whole tiles rather than subtiles.
+
+    A cache may be passed as _stats_ to the exposure functions of
+    `skimage_inline`, so they never scan an image seen before.
+    '''
+
+    def __init__(self):
+        self._stats = {}
+
+    def get(self, image):
+        ''' Return the minimum and maximum of _image_, scanning it once
+
+        Args:
+            image: Numpy array of any shape.
+
+        Returns:
+            Tuple of the minimum and maximum values of _image_.
+        '''
+
+        key = id(image)
+        entry = self._stats.get(key)
+        if entry is not None and entry[0]() is image:
+            return entry[1]
+
+        extrema = minmax(image)
+        stats = self._stats
+
+        def forget(ref):
+            if key in stats and stats[key][0] is ref:
+                del stats[key]
+
+        self._stats[key] = (weakref.ref(image, forget), extrema)
+        return extrema
+
+    def discard(self, image):
+        ''' Forget the cached extrema of _image_, if any '''
+
+        entry = self._stats.get(id(image))
+        if entry is not None and entry[0]() is image:
+            del self._stats[id(image)]
+
+    def clear(self):
+        ''' Forget all cached extrema '''
+
+        self._stats.clear()
+
+    def __len__(self):
+        return len(self._stats)
+
+    def __contains__(self, image):
+        entry = self._stats.get(id(image))
+        return entry is not None and entry[0]() is image
+
+
+def get_tile_stats(image, intensity_stats=None):
+    '''Return the normalized minimum, maximum and mean of a tile image.
+
+    Integer intensities are normalized by the same conversion to floating
+    point as when rendered, so the statistics compare directly with
+    channel threshold ranges.
+
+    Args:
+        image: Numpy 2D image data of a tile.
+        intensity_stats: Optional `IntensityStats` from which to take the
+            extrema of an image scanned before.
+
+    Returns:
+        `TileStats` of float intensities.
+    '''
+
+    if intensity_stats is not None:
+        i_min, i_max = intensity_stats.get(image)
+    else:
+        i_min, i_max = minmax(image)
+    mean = float(np.mean(image))
+    if image.dtype.kind == 'f':
+        return TileStats(float(i_min), float(i_max), mean)
+
+    # The conversion of integers is linear, so convert only the extrema
+    # and the values 0 and 1 from which to scale the mean
+    values = ski.img_as_float64(np.array([0, 1, i_min, i_max],
+                                         dtype=image.dtype))
+    scale = values[1] - values[0]
+    return TileStats(float(values[2]), float(values[3]),
+                     mean * scale + float(values[0]))
+
+
+class TileStatsIndex:
+    ''' Per tile intensity statistics for every channel and pyramid level
+
+    Renderers use the index to skip tiles that provably add nothing to the
+    output image, and to fill fully saturated tiles with their channel
+    color, without converting or even loading those tiles.
+
+    Args:
+        intensity_stats: Optional `IntensityStats` whose cached extrema
+            spare tiles added again, or already scanned elsewhere, a
+            rescan for their minimum and maximum. Defaults to a new one.
+    '''
+
+    def __init__(self, intensity_stats=None):
+        self._stats = {}
+        if intensity_stats is None:
+            intensity_stats = IntensityStats()
+        self.intensity_stats = intensity_stats
+
+    @staticmethod
+    def _key(channel, level, grid):
+        return (int(channel), int(level), int(grid[0]), int(grid[1]))
+
+    def add(self, channel, level, grid, image):
+        ''' Compute and store the statistics of one tile
+
+        Args:
+            channel: Integer channel index.
+            level: Integer pyramid level.
+            grid: Tuple of integer y, x tile grid reference.
+            image: Numpy 2D image data of the tile.
+
+        Returns:
+            The `TileStats` of the tile.
+        '''
+
+        stats = get_tile_stats(image, self.intensity_stats)
+        self._stats[self._key(channel, level, grid)] = stats
+        return stats
+
+    def get(self, channel, level, grid):
+        ''' Return the statistics of one tile
+
+        Args:
+            channel: Integer channel index.
+            level: Integer pyramid level.
+            grid: Tuple of integer y, x tile grid reference.
+
+        Returns:
+            `TileStats` of the tile, or None if the tile is not indexed.
+        '''
+
+        return self._stats.get(self._key(channel, level, grid))
+
+    def classify(self, channel, level, grid, range_min, range_max):
+        ''' Decide how one tile contributes to an output image
+
+        Args:
+            channel: Integer channel index.
+            level: Integer pyramid level.
+            grid: Tuple of integer y, x tile grid reference.
+            range_min: Threshold range minimum, float within 0, 1.
+            range_max: Threshold range maximum, float within 0, 1.
+
+        Returns:
+            `SKIP` if every pixel is at or below _range_min_, `SATURATED`
+            if every pixel is at or above _range_max_, or `RENDER` if the
+            tile must be rendered or is not indexed.
+        '''
+
+        stats = self.get(channel, level, grid)
+        if stats is None or range_min >= range_max:
+            return RENDER
+        if stats.max <= range_min:
+            return SKIP
+        if stats.min >= range_max:
+            return SATURATED
+        return RENDER
+
+    def select_grids(self, channel, level, grids, range_min, range_max):
+        ''' Return the grid references of tiles that must be loaded
+
+        Args:
+            channel: Integer channel index.
+            level: Integer pyramid level.
+            grids: List of tuples of integer y, x tile grid references.
+            range_min: Threshold range minimum, float within 0, 1.
+            range_max: Threshold range maximum, float within 0, 1.
+
+        Returns:
+            List of the tuples in _grids_ classified as `RENDER`.
+        '''
+
+        return [grid for grid in grids
+                if self.classify(channel, level, grid, range_min,
+                                 range_max) == RENDER]
+
+    def save(self, path):
+        ''' Write the index to a numpy `.npz` file
+
+        Args:
+            path: File path or file object.
+        '''
+
+        keys = np.array(list(self._stats.keys()), dtype=np.int64)
+        values = np.array(list(self._stats.values()), dtype=np.float64)
+        np.savez(path, keys=keys.reshape(-1, 4), values=values.reshape(-1, 3))
+
+    @classmethod
+    def load(cls, path):
+        ''' Read an index written by `save`
+
+        Args:
+            path: File path or file object.
+
+        Returns:
+            A new `TileStatsIndex`.
+        '''
+
+        index = cls()
+        with np.load(path) as data:
+            for key, value in zip(data['keys'], data['values']):
+                index._stats[tuple(key.tolist())] = TileStats(*value.tolist())
+        return index
+
+    def __len__(self):
+        return len(self._stats)
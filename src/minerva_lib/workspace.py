@@ -0,0 +1,190 @@
+import weakref
+import threading
+import collections
+import numpy as np
+
+
+class LookupTables(collections.OrderedDict):
+    ''' Dictionary of lookup tables keeping the most recently used
+
+    Args:
+        maxsize: Integer number of tables to keep. Defaults to 16.
+    '''
+
+    def __init__(self, maxsize=16):
+        super().__init__()
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+
+    def __getitem__(self, key):
+        with self._lock:
+            value = super().__getitem__(key)
+            self.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            super().__setitem__(key, value)
+            self.move_to_end(key)
+            while len(self) > self.maxsize:
+                self.popitem(last=False)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+# Lookup tables shared by renders without a workspace
+shared_luts = LookupTables()
+
+
+class Workspace:
+    ''' Preallocated buffers reused across render calls
+
+    Render functions that accept a workspace take their output and scratch
+    arrays from it instead of allocating new ones, so a long-running
+    server can render repeated requests without touching the allocator.
+    Lookup tables built during a render are kept in _luts_ and reused by
+    later renders with the same settings.
+
+    A workspace must not be shared between concurrent renders. Threads
+    of a parallel render each use their own workspace from `for_thread`.
+    '''
+
+    def __init__(self):
+        self._buffers = {}
+        self._threads = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.luts = {}
+
+    def for_thread(self, executor):
+        ''' Return a workspace private to the calling thread of _executor_
+
+        The returned workspace shares the lookup tables of this one and is
+        kept for later calls from the same thread of _executor_, so at most
+        one workspace is kept per worker. The workspaces of an executor
+        are released with the executor or by `release`.
+
+        Args:
+            executor: `concurrent.futures.Executor` running the thread.
+
+        Returns:
+            A `Workspace` for the calling thread.
+        '''
+
+        ident = threading.get_ident()
+        with self._lock:
+            workspaces = self._threads.setdefault(executor, {})
+            workspace = workspaces.get(ident)
+            if workspace is None:
+                workspace = Workspace()
+                workspace.luts = self.luts
+                workspaces[ident] = workspace
+        return workspace
+
+    def release(self, executor):
+        ''' Release the workspaces of the threads of _executor_
+
+        Args:
+            executor: `concurrent.futures.Executor` given to `for_thread`.
+        '''
+
+        with self._lock:
+            self._threads.pop(executor, None)
+
+    def empty(self, name, shape, dtype=np.float64):
+        ''' Return an uninitialized buffer for _name_, _shape_ and _dtype_
+
+        Each name and dtype has one allocation, grown to the largest size
+        requested, so rendering regions of varying shape keeps a bounded
+        number of buffers.
+
+        Args:
+            name: String naming the purpose of the buffer.
+            shape: Tuple of integer dimensions of the buffer.
+            dtype: Numpy dtype of the buffer. Defaults to float64.
+
+        Returns:
+            A contiguous numpy array viewing the start of the allocation
+            for _name_ and _dtype_. Later calls with the same name and
+            dtype may return views of the same memory.
+        '''
+
+        dtype = np.dtype(dtype)
+        shape = tuple(int(d) for d in shape)
+        size = int(np.prod(shape, dtype=np.int64))
+
+        key = (name, dtype.str)
+        buffer = self._buffers.get(key)
+        if buffer is None or buffer.size < size:
+            buffer = np.empty(size, dtype=dtype)
+            self._buffers[key] = buffer
+        return buffer[:size].reshape(shape)
+
+    def zeros(self, name, shape, dtype=np.float64):
+        ''' Return a zero filled buffer for _name_, _shape_ and _dtype_
+
+        Args:
+            name: String naming the purpose of the buffer.
+            shape: Tuple of integer dimensions of the buffer.
+            dtype: Numpy dtype of the buffer. Defaults to float64.
+
+        Returns:
+            A numpy array viewing the allocation for _name_ and _dtype_.
+        '''
+
+        buffer = self.empty(name, shape, dtype)
+        buffer.fill(0)
+        return buffer
+
+    @property
+    def nbytes(self):
+        ''' Total bytes held by all buffers and lookup tables '''
+
+        arrays = list(self._buffers.values()) + list(self.luts.values())
+        arrays += [buffer for workspaces in self._threads.values()
+                   for workspace in workspaces.values()
+                   for buffer in workspace._buffers.values()]
+        return sum(array.nbytes for array in arrays)
+
+    def clear(self):
+        ''' Release all buffers and lookup tables '''
+
+        self._buffers.clear()
+        self._threads.clear()
+        self.luts.clear()
+
+
+def get_buffer(workspace, name, shape, dtype=np.float64):
+    ''' Return a buffer from _workspace_ or a new array without one
+
+    Args:
+        workspace: Optional `Workspace` from which to take the buffer.
+        name: String naming the purpose of the buffer.
+        shape: Tuple of integer dimensions of the buffer.
+        dtype: Numpy dtype of the buffer. Defaults to float64.
+
+    Returns:
+        An uninitialized numpy array.
+    '''
+
+    if workspace is None:
+        return np.empty(shape, dtype=dtype)
+    return workspace.empty(name, shape, dtype)
+
+
+def get_luts(workspace):
+    ''' Return the lookup tables of _workspace_ or the shared tables
+
+    Args:
+        workspace: Optional `Workspace` whose lookup tables to use.
+
+    Returns:
+        A dictionary of lookup tables kept across calls.
+    '''
+
+    if workspace is None:
+        return shared_luts
+    return workspace.luts
@@ -0,0 +1,93 @@
+'''Compare asynchronous render results with expected output'''
+
+import asyncio
+import weakref
+import pytest
+import numpy as np
+from minerva_lib.render import select_grids
+from minerva_lib.aio import composite_subtiles_async
+from minerva_lib.stats import TileStatsIndex
+
+
+def run(coroutine):
+    '''Runs a coroutine to completion in a new event loop.'''
+
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+@pytest.mark.parametrize('as_uint8', [False, True])
+def test_composite_subtiles_async(load_real_tile, real_render,
+                                  real_channels, as_uint8):
+    '''Match a synchronous render with bounded concurrent requests.'''
+
+    pending = []
+    most = []
+
+    async def load_tile(channel, level, grid):
+        pending.append(grid)
+        most.append(len(pending))
+        # Later requests complete first
+        await asyncio.sleep(0.001 * (8 - grid[0] - grid[1]))
+        pending.remove(grid)
+        return load_real_tile(channel, level, grid)
+
+    result = run(composite_subtiles_async(
+        load_tile, real_channels, (256, 256), (100, 50), (700, 900),
+        concurrency=3, as_uint8=as_uint8))
+    expected = real_render(real_channels, (100, 50), (700, 900),
+                           as_uint8=as_uint8)
+
+    np.testing.assert_allclose(expected, result)
+    assert len(most) == 32 and max(most) == 3
+
+
+def test_composite_subtiles_async_stats(load_real_tile, real_render,
+                                        real_channels):
+    '''Request only tiles that the stats index cannot skip.'''
+
+    channels = [dict(real_channels[0], min=0.01), real_channels[1]]
+    stats = TileStatsIndex()
+    for grid in select_grids((256, 256), (0, 0), (1024, 1024)):
+        stats.add(0, 0, grid, load_real_tile(0, 0, grid))
+
+    requested = []
+
+    async def load_tile(channel, level, grid):
+        requested.append((channel, grid))
+        return load_real_tile(channel, level, grid)
+
+    result = run(composite_subtiles_async(
+        load_tile, channels, (256, 256), (0, 0), (1024, 1024),
+        stats=stats))
+
+    np.testing.assert_allclose(real_render(channels, (0, 0), (1024, 1024)),
+                               result)
+    # Five green tiles lie entirely below the range minimum
+    assert len(requested) == 27
+
+
+def test_composite_subtiles_async_frees_tiles(load_real_tile, real_render,
+                                              real_channels):
+    '''Keep only the tiles of pending requests while rendering.'''
+
+    images = []
+    live = []
+
+    async def load_tile(channel, level, grid):
+        live.append(sum(ref() is not None for ref in images))
+        await asyncio.sleep(0)
+        image = load_real_tile(channel, level, grid).copy()
+        images.append(weakref.ref(image))
+        return image
+
+    result = run(composite_subtiles_async(
+        load_tile, real_channels, (256, 256), (0, 0), (1024, 1024),
+        concurrency=3))
+
+    np.testing.assert_allclose(real_render(real_channels, (0, 0),
+                                           (1024, 1024)), result)
+    assert len(images) == 32 and max(live) <= 3
@@ -0,0 +1,123 @@
+'''Compare kernel backend results with expected output'''
+
+import pytest
+import numpy as np
+from minerva_lib.backends import (BACKEND_ENV, get_backend, list_backends,
+                                  register_backend, unregister_backend)
+from minerva_lib.render import (composite_channels, composite_subtiles,
+                                accumulate_channel, gamma_correct)
+
+
+@pytest.fixture
+def backend_channels():
+    image = np.arange(64, dtype=np.uint16).reshape(8, 8) * 1000
+    return [{
+        'image': image,
+        'color': np.array([1, 0.5, 0]),
+        'min': 0.1,
+        'max': 0.8
+    }, {
+        'image': image.T,
+        'color': np.array([0, 0.5, 1]),
+        'min': 0,
+        'max': 1
+    }]
+
+
+@pytest.fixture
+def counting_backend():
+    '''Backend wrapping the numpy kernels that counts kernel calls.'''
+
+    calls = []
+
+    def composite(*args):
+        calls.append('composite')
+        return accumulate_channel(*args)
+
+    def gamma(*args, **kwargs):
+        calls.append('gamma')
+        return gamma_correct(*args, **kwargs)
+
+    register_backend('counting', composite, gamma)
+    yield calls
+    unregister_backend('counting')
+
+
+def test_get_backend(monkeypatch):
+    '''Select backends by name, by environment or by default.'''
+
+    monkeypatch.delenv(BACKEND_ENV, raising=False)
+    numpy_backend = get_backend()
+
+    assert numpy_backend.name == 'numpy'
+    assert get_backend(numpy_backend) is numpy_backend
+    assert 'numpy' in list_backends()
+
+    with pytest.raises(ValueError):
+        get_backend('missing')
+
+    # Unavailable backends from the environment fall back to numpy
+    monkeypatch.setenv(BACKEND_ENV, 'missing')
+    with pytest.warns(RuntimeWarning):
+        assert get_backend() is numpy_backend
+
+
+def test_unregister_backend():
+    '''Remove a registered backend by name.'''
+
+    register_backend('removed', accumulate_channel, gamma_correct)
+    unregister_backend('removed')
+
+    assert 'removed' not in list_backends()
+    with pytest.raises(ValueError):
+        get_backend('removed')
+    with pytest.raises(ValueError):
+        unregister_backend('removed')
+
+
+def test_channels_backend(backend_channels, counting_backend, monkeypatch):
+    '''Dispatch channel kernels by argument or by environment.'''
+
+    monkeypatch.delenv(BACKEND_ENV, raising=False)
+    expected = composite_channels(backend_channels)
+    assert not counting_backend
+
+    result = composite_channels(backend_channels, backend='counting')
+    np.testing.assert_allclose(expected, result)
+    assert counting_backend == ['composite', 'composite', 'gamma']
+
+    monkeypatch.setenv(BACKEND_ENV, 'counting')
+    counting_backend.clear()
+    result = composite_channels(backend_channels, as_uint8=True)
+    assert counting_backend == ['composite', 'composite', 'gamma']
+
+
+def test_subtiles_backend(backend_channels, counting_backend):
+    '''Dispatch tile kernels through the selected backend.'''
+
+    tiles = [dict(channel, grid=(y, x))
+             for y in range(2) for x in range(2)
+             for channel in backend_channels]
+
+    expected = composite_subtiles(tiles, (8, 8), (4, 4), (8, 8))
+    result = composite_subtiles(tiles, (8, 8), (4, 4), (8, 8),
+                                backend='counting')
+
+    np.testing.assert_allclose(expected, result)
+    assert counting_backend.count('composite') == 8
+    assert counting_backend.count('gamma') == 1
+
+
+@pytest.mark.parametrize('as_uint8', [False, True])
+def test_numba_backend(backend_channels, as_uint8):
+    '''Match the numpy backend with the fused numba kernels.'''
+
+    pytest.importorskip('numba')
+
+    expected = composite_channels(backend_channels, as_uint8=as_uint8,
+                                  backend='numpy')
+    result = composite_channels(backend_channels, as_uint8=as_uint8,
+                                backend='numba')
+
+    np.testing.assert_allclose(expected, result, rtol=1e-5,
+                               atol=1 if as_uint8 else 1e-6)
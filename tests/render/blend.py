@@ -2,7 +2,10 @@
 
 import pytest
 import numpy as np
-from minerva_lib.render import composite_channel, composite_channels
+from minerva_lib.render import (composite_channel, composite_channels,
+                                build_channel_lut, composite_channel_lut,
+                                build_gamma_lut, quantize_gamma)
+from minerva_lib.workspace import Workspace, LookupTables, shared_luts
 
 
 @pytest.fixture
@@ -198,6 +201,41 @@ def test_channel_khaki_low(u16_3value_channel, color_khaki, range_low,
     np.testing.assert_allclose(expected, result)
 
 
+def test_channel_float32(u16_3value_channel, colors, ranges,
+                         f32_3value_rgb_buffer):
+    '''Render a channel in float32, matching the float64 result'''
+
+    expected = composite_channel(f32_3value_rgb_buffer, u16_3value_channel,
+                                 colors, *ranges)
+
+    result = composite_channel(f32_3value_rgb_buffer, u16_3value_channel,
+                               colors, *ranges, dtype=np.float32)
+
+    np.testing.assert_allclose(expected, result, rtol=1e-6)
+
+
+def test_channel_lut_khaki_low(u16_3value_channel, color_khaki, range_low,
+                               f32_3value_rgb_buffer):
+    '''Composite through a lookup table, matching the float path'''
+
+    expected = composite_channel(f32_3value_rgb_buffer, u16_3value_channel,
+                                 color_khaki, *range_low)
+
+    lut = build_channel_lut(np.uint16, color_khaki, *range_low)
+    result = composite_channel_lut(f32_3value_rgb_buffer, u16_3value_channel,
+                                   lut)
+
+    assert lut.shape == (65536, 3)
+    np.testing.assert_allclose(expected, result)
+
+
+def test_channel_lut_invalid_dtype(color_white, range_all):
+    '''Lookup tables cannot be built for float images'''
+
+    with pytest.raises(ValueError):
+        build_channel_lut(np.float32, color_white, *range_all)
+
+
 def test_channels_two_channel(u16_checkered_channel,
                               u16_checkered_channel_inverse,
                               color_blue, color_yellow, range_all):
@@ -253,3 +291,245 @@ def test_channels_size_zero():
 
     with pytest.raises(ValueError):
         composite_channels([])
+
+
+def test_channels_two_channel_lut(u16_checkered_channel,
+                                  u16_checkered_channel_inverse,
+                                  color_blue, color_yellow, range_all):
+    '''Test blending two channels through lookup tables'''
+
+    expected = np.array([
+        [color_yellow, color_blue],
+        [color_blue, color_yellow],
+    ], dtype=np.float32)
+
+    result = composite_channels([
+        {
+            'image': u16_checkered_channel,
+            'color': color_blue,
+            'min': range_all[0],
+            'max': range_all[1]
+        },
+        {
+            'image': u16_checkered_channel_inverse,
+            'color': color_yellow,
+            'min': range_all[0],
+            'max': range_all[1]
+        }
+    ], use_lut=True)
+
+    np.testing.assert_allclose(expected, result)
+
+
+def test_channels_lut_shared(u16_3value_channel, color_khaki, range_low):
+    '''Reuse lookup tables across calls without a workspace'''
+
+    channels = [{
+        'image': u16_3value_channel,
+        'color': color_khaki,
+        'min': range_low[0],
+        'max': range_low[1]
+    }]
+    shared_luts.clear()
+
+    expected = composite_channels(channels)
+    result = composite_channels(channels, use_lut=True)
+    assert len(shared_luts) == 1
+    lut = next(iter(shared_luts.values()))
+
+    np.testing.assert_allclose(expected, result, atol=1e-6)
+    np.testing.assert_allclose(expected,
+                               composite_channels(channels, use_lut=True),
+                               atol=1e-6)
+    assert next(iter(shared_luts.values())) is lut
+
+
+def test_lookup_tables_bounded():
+    '''Keep only the most recently used lookup tables'''
+
+    luts = LookupTables(maxsize=2)
+    luts['a'] = 1
+    luts['b'] = 2
+    assert luts['a'] == 1
+    luts['c'] = 3
+
+    assert list(luts) == ['a', 'c']
+    assert luts.get('b') is None
+
+
+def test_channels_two_channel_fused(u16_checkered_channel,
+                                    u16_checkered_channel_inverse,
+                                    color_blue, color_yellow, range_all):
+    '''Test blending two channels with one color matrix contraction'''
+
+    expected = np.array([
+        [color_yellow, color_blue],
+        [color_blue, color_yellow],
+    ], dtype=np.float32)
+
+    result = composite_channels([
+        {
+            'image': u16_checkered_channel,
+            'color': color_blue,
+            'min': range_all[0],
+            'max': range_all[1]
+        },
+        {
+            'image': u16_checkered_channel_inverse,
+            'color': color_yellow,
+            'min': range_all[0],
+            'max': range_all[1]
+        }
+    ], fused=True)
+
+    np.testing.assert_allclose(expected, result)
+
+
+def test_channels_fused_matches_loop(u16_3value_channel, colors, ranges):
+    '''Ensure the fused compositor matches compositing channel by channel'''
+
+    channels = [{
+        'image': u16_3value_channel,
+        'color': colors,
+        'min': ranges[0],
+        'max': ranges[1]
+    }, {
+        'image': u16_3value_channel[::-1],
+        'color': colors[::-1],
+        'min': 0,
+        'max': 1
+    }]
+
+    expected = composite_channels(channels)
+    result = composite_channels(channels, fused=True)
+
+    np.testing.assert_allclose(expected, result, rtol=1e-6)
+
+
+def test_channels_two_channel_uint8(u16_checkered_channel,
+                                    u16_checkered_channel_inverse,
+                                    color_blue, color_khaki, range_all):
+    '''Test blending two channels directly into a uint8 image'''
+
+    channels = [
+        {
+            'image': u16_checkered_channel,
+            'color': color_blue,
+            'min': range_all[0],
+            'max': range_all[1]
+        },
+        {
+            'image': u16_checkered_channel_inverse,
+            'color': color_khaki,
+            'min': range_all[0],
+            'max': range_all[1]
+        }
+    ]
+
+    expected = np.uint8(255 * composite_channels(channels))
+    result = composite_channels(channels, as_uint8=True)
+
+    assert result.dtype == np.uint8
+    np.testing.assert_allclose(expected, result, atol=1)
+
+
+@pytest.mark.parametrize('options', [{}, {'use_lut': True}, {'fused': True},
+                                     {'as_uint8': True}])
+def test_channels_planar_matches_interleaved(colors, ranges, options):
+    '''Ensure planar accumulation matches the interleaved accumulator'''
+
+    image = np.arange(60, dtype=np.uint16).reshape(6, 10) * 1000
+    channels = [{
+        'image': image,
+        'color': colors,
+        'min': ranges[0],
+        'max': ranges[1]
+    }, {
+        'image': image[::-1],
+        'color': colors[::-1],
+        'min': 0,
+        'max': 1
+    }]
+
+    expected = composite_channels(channels, **options)
+    workspace = Workspace()
+    for _ in range(2):
+        result = composite_channels(channels, planar=True,
+                                    workspace=workspace, **options)
+
+        assert result.shape == expected.shape
+        assert result.dtype == expected.dtype
+        np.testing.assert_allclose(expected, result, rtol=1e-6)
+
+
+@pytest.mark.parametrize('options', [{}, {'use_lut': True}, {'fused': True},
+                                     {'planar': True}])
+@pytest.mark.parametrize('dtype', [np.float32, np.float64])
+def test_channels_dtype(colors, ranges, options, dtype):
+    '''Render all channels and the composite image in one precision'''
+
+    image = np.arange(60, dtype=np.uint16).reshape(6, 10) * 1000
+    channels = [{
+        'image': image,
+        'color': colors,
+        'min': ranges[0],
+        'max': ranges[1]
+    }, {
+        'image': image[::-1],
+        'color': colors[::-1],
+        'min': 0,
+        'max': 1
+    }]
+
+    expected = composite_channels(channels, **options)
+    result = composite_channels(channels, dtype=dtype, **options)
+
+    assert result.dtype == dtype
+    np.testing.assert_allclose(expected, result, rtol=1e-5, atol=1e-6)
+
+
+def test_quantize_gamma_bounds():
+    '''Clip out of range values and keep the table endpoints'''
+
+    image = np.array([[-0.5, 0, 1, 1.5]])
+    lut = build_gamma_lut(2.2)
+
+    result = quantize_gamma(image, 2.2, lut=lut)
+
+    assert lut[0] == 0 and lut[-1] == 255
+    np.testing.assert_array_equal([[0, 0, 255, 255]], result)
+
+
+def test_channels_out_workspace(u16_checkered_channel,
+                                u16_checkered_channel_inverse,
+                                color_blue, color_yellow, range_all):
+    '''Blend into an output argument using a reusable workspace'''
+
+    expected = np.array([
+        [color_yellow, color_blue],
+        [color_blue, color_yellow],
+    ], dtype=np.float32)
+
+    channels = [
+        {
+            'image': u16_checkered_channel,
+            'color': color_blue,
+            'min': range_all[0],
+            'max': range_all[1]
+        },
+        {
+            'image': u16_checkered_channel_inverse,
+            'color': color_yellow,
+            'min': range_all[0],
+            'max': range_all[1]
+        }
+    ]
+
+    workspace = Workspace()
+    out = np.full(expected.shape, np.nan, dtype=np.float32)
+
+    for fused in (False, True, False):
+        result = composite_channels(channels, fused=fused, out=out,
+                                    workspace=workspace)
+        assert result is out
+        np.testing.assert_allclose(expected, result)
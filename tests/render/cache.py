@@ -0,0 +1,100 @@
+'''Compare tile cache results with uncached renders'''
+
+import pytest
+import numpy as np
+from minerva_lib.cache import TileCache
+from minerva_lib.render import composite_subtiles
+
+
+@pytest.fixture(scope='module')
+def cache_tiles():
+    '''Two uint16 channels of a two by two grid of tiles.'''
+
+    images = np.random.RandomState(0).randint(0, 65536, (2, 4, 8, 8))
+    images = images.astype(np.uint16)
+
+    return [{
+        'source': 'image',
+        'channel': channel,
+        'grid': (i // 2, i % 2),
+        'image': images[channel, i],
+        'color': color,
+        'min': 0.1,
+        'max': 0.8
+    } for channel, color in enumerate([np.array([1, 0, 0]),
+                                       np.array([0, 0.5, 1])])
+        for i in range(4)]
+
+
+def test_lru_eviction():
+    '''Evict the least recently used tiles to stay within the budget.'''
+
+    image = np.zeros((4, 4), dtype=np.uint8)
+    cache = TileCache(max_bytes=2 * 64)
+
+    a = cache.load(('a', 0, 0, (0, 0)), image)
+    cache.load(('b', 0, 0, (0, 0)), image)
+    assert a.dtype == np.float32
+    assert not a.flags.writeable
+
+    # Reading the first tile makes the second the least recently used
+    assert cache.get(('a', 0, 0, (0, 0))) is a
+    cache.load(('c', 0, 0, (0, 0)), lambda: image)
+
+    assert ('a', 0, 0, (0, 0)) in cache
+    assert ('b', 0, 0, (0, 0)) not in cache
+    assert len(cache) == 2
+    assert cache.nbytes == 2 * 64
+
+    # Tiles larger than the budget are converted but not kept
+    cache.load(('d', 0, 0, (0, 0)), np.zeros((8, 8), dtype=np.uint8))
+    assert len(cache) == 2
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.nbytes == 0
+
+
+@pytest.mark.parametrize('dtype', [np.float32, np.float64])
+def test_cached_render(cache_tiles, dtype):
+    '''Match an uncached render, and render again without loading.'''
+
+    expected = composite_subtiles(cache_tiles, (4, 4), (1, 1), (6, 6),
+                                  dtype=dtype)
+
+    cache = TileCache()
+    result = composite_subtiles(cache_tiles, (4, 4), (1, 1), (6, 6),
+                                dtype=dtype, tile_cache=cache)
+    np.testing.assert_allclose(expected, result, rtol=1e-5, atol=1e-6)
+    assert len(cache) == len(cache_tiles)
+
+    def fail():
+        raise AssertionError('Cached tile loaded again')
+
+    tiles = [dict(tile, image=fail) for tile in cache_tiles]
+    result = composite_subtiles(tiles, (4, 4), (1, 1), (6, 6), dtype=dtype,
+                                tile_cache=cache)
+    np.testing.assert_allclose(expected, result, rtol=1e-5, atol=1e-6)
+
+
+def test_cache_sources(cache_tiles):
+    '''Cache tiles of each source apart, and never tiles without one.'''
+
+    cache = TileCache()
+    other = [dict(tile, source='other', image=tile['image'] // 2)
+             for tile in cache_tiles]
+
+    for tiles in (cache_tiles, other):
+        expected = composite_subtiles(tiles, (4, 4), (1, 1), (6, 6))
+        result = composite_subtiles(tiles, (4, 4), (1, 1), (6, 6),
+                                    tile_cache=cache)
+        np.testing.assert_allclose(expected, result, rtol=1e-5, atol=1e-6)
+    assert len(cache) == 2 * len(cache_tiles)
+
+    anonymous = [dict(tile, source=None) for tile in cache_tiles]
+    cache.clear()
+    composite_subtiles(anonymous, (4, 4), (1, 1), (6, 6), tile_cache=cache)
+    assert len(cache) == 0
+
+    with pytest.raises(ValueError):
+        TileCache.key(anonymous[0])
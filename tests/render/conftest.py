@@ -0,0 +1,57 @@
+'''Fixtures of the red and green test image shared by render tests'''
+
+import pytest
+import numpy as np
+from pathlib import Path
+from minerva_lib.render import composite_subtiles, select_grids
+
+DATA = Path(__file__).resolve().parent.parent / 'data'
+
+
+def read_real_tile(channel, level, grid):
+    '''Loads a 256x256 px tile of the red and green test image.'''
+
+    y, x = grid
+    color = ['green', 'red'][channel]
+    return np.load(DATA / color / str(x) / str(y) / 'tile.npy')
+
+
+def render_real_tiles(channels, output_origin, output_shape, **kwargs):
+    '''Renders a region of the red and green test image in one call.'''
+
+    tiles = [dict(channel, grid=grid,
+                  image=read_real_tile(index, 0, grid))
+             for grid in select_grids((256, 256), output_origin,
+                                      output_shape)
+             for index, channel in enumerate(channels)]
+    return composite_subtiles(tiles, (256, 256), output_origin,
+                              output_shape, **kwargs)
+
+
+@pytest.fixture(scope='session')
+def load_real_tile():
+    '''Tile loader of the red and green test image.'''
+
+    return read_real_tile
+
+
+@pytest.fixture(scope='session')
+def real_render():
+    '''Render function for regions of the red and green test image.'''
+
+    return render_real_tiles
+
+
+@pytest.fixture
+def real_channels():
+    '''Green and red channel settings of the red and green test image.'''
+
+    return [{
+        'color': np.array([0, 1, 0], dtype=np.float32),
+        'min': 0.006,
+        'max': 0.024
+    }, {
+        'color': np.array([1, 0, 0], dtype=np.float32),
+        'min': 0,
+        'max': 1
+    }]
@@ -1,6 +1,8 @@
 '''Compare crop results with expected output'''
 
+import gc
 import pytest
+import weakref
 import numpy as np
 from pathlib import Path
 from inspect import currentframe, getframeinfo
@@ -11,8 +13,12 @@ from minerva_lib.render import (scale_image_nearest_neighbor,
                                 transform_coordinates_to_level, select_grids,
                                 validate_region_bounds, select_subregion,
                                 select_position, composite_subtile,
-                                composite_subtiles, extract_subtile)
+                                composite_subtiles, extract_subtile,
+                                get_band_height, composite_viewports,
+                                group_tiles_by_band)
+import concurrent.futures
 from minerva_lib import skimage_inline as ski
+from minerva_lib.workspace import Workspace
 
 
 @pytest.fixture(scope='module')
@@ -182,6 +188,32 @@ def real_tiles_green_mask(dirname):
     ]
 
 
+@pytest.fixture(scope='module')
+def real_tiles(real_tiles_green_mask, real_tiles_red_mask, color_red,
+               color_green):
+    '''Red and green 256x256 px tiles of a 1024x1024 px image.'''
+
+    inputs = []
+
+    for y in range(0, 4):
+        for x in range(0, 4):
+            inputs += [{
+                'min': 0.006,
+                'max': 0.024,
+                'grid': (y, x),
+                'image': real_tiles_green_mask[y][x],
+                'color': color_green
+            }, {
+                'min': 0,
+                'max': 1,
+                'grid': (y, x),
+                'image': real_tiles_red_mask[y][x],
+                'color': color_red
+            }]
+
+    return inputs
+
+
 @pytest.fixture(scope='module')
 def level0_tiles_green_mask():
     '''Nine 2x2 pixel tiles, green channel.'''
@@ -527,6 +559,16 @@ def test_tile_count_3_3():
     np.testing.assert_array_equal(expected, result)
 
 
+def test_tile_count_offset_region():
+    '''Ensure no extra tiles are counted for a region offset into a tile.'''
+
+    expected = (1, 4)
+
+    result = get_region_grid_shape((256, 256), (768, 50), (132, 900))
+
+    np.testing.assert_array_equal(expected, result)
+
+
 def test_validate_region_whole():
     '''Ensure full region is validated.'''
 
@@ -862,3 +904,308 @@ def test_composite_subtiles_real(real_tiles_green_mask, real_tiles_red_mask,
                                 (0, 0), (1024, 1024))
 
     np.testing.assert_allclose(expected, np.uint8(255*result))
+
+
+def test_composite_subtiles_lut(real_tiles):
+    '''Ensure rendering through lookup tables matches the float path.'''
+
+    expected = composite_subtiles(real_tiles, (256, 256),
+                                  (0, 0), (1024, 1024))
+
+    result = composite_subtiles(real_tiles, (256, 256),
+                                (0, 0), (1024, 1024), use_lut=True)
+
+    np.testing.assert_allclose(expected, result)
+
+
+def test_composite_subtiles_float32(real_tiles):
+    '''Ensure rendering in float32 matches the float64 render.'''
+
+    expected = composite_subtiles(real_tiles, (256, 256),
+                                  (0, 0), (1024, 1024))
+
+    for use_lut in (False, True):
+        result = composite_subtiles(real_tiles, (256, 256),
+                                    (0, 0), (1024, 1024), use_lut=use_lut,
+                                    dtype=np.float32)
+
+        assert result.dtype == np.float32
+        np.testing.assert_allclose(expected, result, rtol=1e-5, atol=1e-6)
+
+
+def test_composite_subtiles_uint8(real_tiles, real_stitched_with_gamma):
+    '''Ensure direct uint8 output matches the quantized float render.'''
+
+    expected = real_stitched_with_gamma
+
+    result = composite_subtiles(real_tiles, (256, 256),
+                                (0, 0), (1024, 1024), as_uint8=True)
+
+    assert result.dtype == np.uint8
+    np.testing.assert_allclose(expected, result, atol=1)
+
+
+def test_composite_subtiles_workspace(real_tiles, real_stitched_with_gamma):
+    '''Ensure renders reusing a workspace and output match a fresh render.'''
+
+    expected = composite_subtiles(real_tiles, (256, 256),
+                                  (0, 0), (1024, 1024))
+
+    workspace = Workspace()
+    out = np.empty((1024, 1024, 3))
+    out_u8 = np.empty((1024, 1024, 3), dtype=np.uint8)
+
+    for _ in range(2):
+        result = composite_subtiles(real_tiles, (256, 256), (0, 0),
+                                    (1024, 1024), out=out,
+                                    workspace=workspace)
+        assert result is out
+        np.testing.assert_allclose(expected, result)
+
+    nbytes = workspace.nbytes
+
+    for use_lut in (False, True):
+        result = composite_subtiles(real_tiles, (256, 256), (0, 0),
+                                    (1024, 1024), use_lut=use_lut,
+                                    as_uint8=True, out=out_u8,
+                                    workspace=workspace)
+        assert result is out_u8
+        np.testing.assert_allclose(real_stitched_with_gamma, result, atol=1)
+
+    assert workspace.nbytes > nbytes
+
+
+def test_composite_subtiles_workspace_bounded(real_tiles):
+    '''Ensure a workspace stops growing when rendering many viewports.'''
+
+    workspace = Workspace()
+    origins = np.random.RandomState(0).randint(0, 724, (50, 2))
+
+    def render(origin, **kwargs):
+        grids = set(select_grids((256, 256), origin, (300, 300)))
+        tiles = [tile for tile in real_tiles if tile['grid'] in grids]
+        return composite_subtiles(tiles, (256, 256), origin, (300, 300),
+                                  **kwargs)
+
+    # Whole tiles need the largest buffers
+    for as_uint8 in (False, True):
+        render((0, 0), as_uint8=as_uint8, workspace=workspace)
+    nbytes = workspace.nbytes
+
+    for origin in origins:
+        for as_uint8 in (False, True):
+            np.testing.assert_allclose(
+                render(origin, as_uint8=as_uint8),
+                render(origin, as_uint8=as_uint8, workspace=workspace))
+
+    assert workspace.nbytes == nbytes
+
+
+def test_composite_subtiles_bands(real_tiles, real_stitched_with_gamma):
+    '''Ensure band-blocked rendering matches rendering the whole image.'''
+
+    expected = composite_subtiles(real_tiles, (256, 256),
+                                  (0, 0), (1024, 1024))
+
+    for band_height in (100, get_band_height(1024), 2048):
+        result = composite_subtiles(iter(real_tiles), (256, 256), (0, 0),
+                                    (1024, 1024), band_height=band_height)
+        np.testing.assert_allclose(expected, result)
+
+    result = composite_subtiles(real_tiles, (256, 256), (0, 0),
+                                (1024, 1024), as_uint8=True, band_height=100)
+    np.testing.assert_allclose(real_stitched_with_gamma, result, atol=1)
+
+
+def test_group_tiles_by_band():
+    '''Ensure each band lists only the tiles that overlap its rows.'''
+
+    tiles = [{'grid': (y, x)} for y in range(3) for x in range(2)]
+    bands = group_tiles_by_band(tiles, (100, 100), (50, 0), (200, 200), 80)
+
+    assert [rows for rows, _ in bands] == [(0, 80), (80, 160), (160, 200)]
+    assert [[t['grid'] for t in band] for _, band in bands] == [
+        [(0, 0), (0, 1), (1, 0), (1, 1)],
+        [(1, 0), (1, 1), (2, 0), (2, 1)],
+        [(2, 0), (2, 1)],
+    ]
+
+
+def test_composite_subtiles_bands_load_once(real_tiles):
+    '''Ensure banded and threaded renders load each tile only once.'''
+
+    expected = composite_subtiles(real_tiles, (256, 256),
+                                  (0, 0), (1024, 1024))
+    loads = []
+
+    def lazy(tile):
+        def load():
+            loads.append(tile['grid'])
+            return tile['image']
+        return dict(tile, image=load)
+
+    for workers in (None, 3):
+        loads.clear()
+        result = composite_subtiles([lazy(tile) for tile in real_tiles],
+                                    (256, 256), (0, 0), (1024, 1024),
+                                    band_height=8, workers=workers)
+        np.testing.assert_allclose(expected, result)
+        assert len(loads) == len(real_tiles)
+
+
+def test_composite_subtiles_bands_release(real_tiles):
+    '''Ensure banded renders free each tile after its last band.'''
+
+    expected = composite_subtiles(real_tiles, (256, 256),
+                                  (0, 0), (1024, 1024))
+    images = []
+    live = []
+
+    def lazy(tile):
+        def load():
+            live.append(sum(ref() is not None for ref in images))
+            image = tile['image'].copy()
+            images.append(weakref.ref(image))
+            return image
+        return dict(tile, image=load)
+
+    # Two channels of four tiles span each row of tiles
+    for workers, most in ((None, 8), (2, 16)):
+        images.clear()
+        live.clear()
+        result = composite_subtiles([lazy(tile) for tile in real_tiles],
+                                    (256, 256), (0, 0), (1024, 1024),
+                                    band_height=64, workers=workers)
+        np.testing.assert_allclose(expected, result)
+        assert len(images) == len(real_tiles) and max(live) < most
+
+
+def test_composite_subtiles_workers(real_tiles, real_stitched_with_gamma):
+    '''Ensure rendering with worker threads matches a sequential render.'''
+
+    expected = composite_subtiles(real_tiles, (256, 256),
+                                  (0, 0), (1024, 1024))
+
+    for band_height in (None, 100):
+        result = composite_subtiles(iter(real_tiles), (256, 256), (0, 0),
+                                    (1024, 1024), workers=4,
+                                    band_height=band_height)
+        np.testing.assert_allclose(expected, result)
+
+    workspace = Workspace()
+    with concurrent.futures.ThreadPoolExecutor(3) as executor:
+        for _ in range(2):
+            result = composite_subtiles(real_tiles, (256, 256), (0, 0),
+                                        (1024, 1024), use_lut=True,
+                                        as_uint8=True, workspace=workspace,
+                                        executor=executor)
+            np.testing.assert_allclose(real_stitched_with_gamma, result,
+                                       atol=1)
+        assert len(workspace._threads[executor]) <= 3
+
+    workspace.release(executor)
+    assert not workspace._threads
+
+
+def test_composite_subtiles_workers_release(real_tiles):
+    '''Ensure thread workspaces do not outlive their worker threads.'''
+
+    workspace = Workspace()
+    for _ in range(3):
+        composite_subtiles(real_tiles, (256, 256), (0, 0), (1024, 1024),
+                           as_uint8=True, workspace=workspace, workers=2)
+        assert not workspace._threads
+
+    executor = concurrent.futures.ThreadPoolExecutor(2)
+    composite_subtiles(real_tiles, (256, 256), (0, 0), (1024, 1024),
+                       as_uint8=True, workspace=workspace, executor=executor)
+    assert len(workspace._threads) == 1
+
+    executor.shutdown()
+    del executor
+    gc.collect()
+    assert not workspace._threads
+
+
+def test_composite_subtiles_workers_uncovered(level0_tiles_green_mask,
+                                              color_green):
+    '''Ensure output areas without tiles are black with worker threads.'''
+
+    out = np.full((6, 6, 3), 255, dtype=np.uint8)
+
+    result = composite_subtiles([{
+        'min': 0,
+        'max': 1,
+        'grid': (0, 0),
+        'image': level0_tiles_green_mask[0][0],
+        'color': color_green
+    }], (2, 2), (0, 0), (6, 6), as_uint8=True, out=out, workers=2)
+
+    assert result is out
+    assert result[0, 1, 1] == 255
+    assert not result[2:].any() and not result[:, 2:].any()
+
+
+def test_composite_subtiles_stream(real_tiles):
+    '''Ensure streamed grid cells match a full render as they finish.'''
+
+    expected = composite_subtiles(real_tiles, (256, 256), (100, 50),
+                                  (700, 900), as_uint8=True)
+    tiles = [tile for tile in real_tiles
+             if tile['grid'] in select_grids((256, 256), (100, 50),
+                                             (700, 900))]
+
+    # Consecutive tiles of each cell, or all tiles of each channel in turn
+    orders = [(tiles, None), (tiles[0::2] + tiles[1::2], 2)]
+    for order, channel_count in orders:
+        cells = []
+
+        def callback(region, image):
+            np.testing.assert_allclose(expected[region], image)
+            cells.append(region)
+
+        result = composite_subtiles(iter(order), (256, 256), (100, 50),
+                                    (700, 900), as_uint8=True,
+                                    callback=callback,
+                                    channel_count=channel_count)
+
+        np.testing.assert_allclose(expected, result)
+        assert len(cells) == len(tiles) // 2
+
+    with pytest.raises(ValueError):
+        composite_subtiles(tiles, (256, 256), (100, 50), (700, 900),
+                           callback=callback, workers=2)
+
+    # Tiles of each channel in turn need a count of tiles per cell
+    with pytest.raises(ValueError):
+        composite_subtiles(tiles[0::2] + tiles[1::2], (256, 256), (100, 50),
+                           (700, 900), callback=lambda *args: None)
+
+
+def test_composite_viewports(real_tiles, real_stitched_with_gamma):
+    '''Ensure a batch of viewports matches rendering each viewport.'''
+
+    viewports = [((0, 0), (256, 256)), ((100, 200), (300, 500)),
+                 ((768, 768), (256, 256)), ((0, 0), (1024, 1024))]
+
+    for use_lut in (False, True):
+        results = composite_viewports(iter(real_tiles), (256, 256),
+                                      viewports, use_lut=use_lut)
+
+        assert len(results) == len(viewports)
+        for viewport, result in zip(viewports, results):
+            grids = select_grids((256, 256), *viewport)
+            tiles = [tile for tile in real_tiles if tile['grid'] in grids]
+            expected = composite_subtiles(tiles, (256, 256), *viewport)
+            np.testing.assert_allclose(expected, result)
+
+    results = composite_viewports(real_tiles, (256, 256), viewports[-1:],
+                                  as_uint8=True)
+    np.testing.assert_allclose(real_stitched_with_gamma, results[0], atol=1)
+
+    # Tiles may be loaded when needed
+    lazy_tiles = [dict(tile, image=lambda image=tile['image']: image)
+                  for tile in real_tiles]
+    results = composite_viewports(lazy_tiles, (256, 256), viewports[-1:],
+                                  as_uint8=True)
+    np.testing.assert_allclose(real_stitched_with_gamma, results[0], atol=1)
@@ -0,0 +1,178 @@
+'''Compare incremental render results with full renders'''
+
+import pytest
+import numpy as np
+from minerva_lib.cache import TileCache
+from minerva_lib.render import composite_subtiles, select_grids
+from minerva_lib.incremental import (IncrementalRenderer, ViewportRenderer,
+                                     get_exposed_regions)
+
+
+@pytest.fixture(scope='module')
+def channel_tiles(load_real_tile):
+    '''Tiles of the red and green test image needed for each channel.'''
+
+    grids = select_grids((256, 256), (100, 60), (300, 400))
+
+    return {
+        color: [{
+            'grid': (y, x),
+            'image': load_real_tile(channel, 0, (y, x))
+        } for y, x in grids]
+        for channel, color in enumerate(['green', 'red'])
+    }
+
+
+def full_render(channel_tiles, settings, **kwargs):
+    tiles = [dict(tile, color=color, min=r_min, max=r_max)
+             for name, (color, r_min, r_max) in settings.items()
+             for tile in channel_tiles[name]]
+    return composite_subtiles(tiles, (256, 256), (100, 60), (300, 400),
+                              **kwargs)
+
+
+@pytest.mark.parametrize('as_uint8', [False, True])
+def test_update_channel(channel_tiles, as_uint8):
+    '''Match a full render after changing one channel.'''
+
+    settings = {
+        'green': (np.array([0, 1, 0]), 0.006, 0.024),
+        'red': (np.array([1, 0, 0]), 0, 1)
+    }
+    renderer = IncrementalRenderer((256, 256), (100, 60), (300, 400),
+                                   as_uint8=as_uint8)
+    for name, (color, r_min, r_max) in settings.items():
+        renderer.set_channel(name, channel_tiles[name], color, r_min, r_max)
+
+    np.testing.assert_allclose(renderer.render(),
+                               full_render(channel_tiles, settings,
+                                           as_uint8=as_uint8))
+
+    settings['green'] = (np.array([0, 1, 1]), 0.01, 0.03)
+    renderer.update_channel('green', *settings['green'])
+
+    expected = full_render(channel_tiles, settings, as_uint8=as_uint8)
+    np.testing.assert_allclose(renderer.render(), expected, atol=1e-12)
+    # Repeated renders do not change the kept sum
+    np.testing.assert_allclose(renderer.render(), expected, atol=1e-12)
+
+
+@pytest.mark.parametrize('use_lut', [False, True])
+def test_update_channel_loads_once(channel_tiles, use_lut):
+    '''Load callable tiles once, and not again for updates.'''
+
+    loaded = []
+
+    def lazy(tile):
+        def load():
+            loaded.append(tile['grid'])
+            return tile['image']
+        return dict(tile, image=load)
+
+    settings = {'green': (np.array([0, 1, 0]), 0.006, 0.024)}
+    renderer = IncrementalRenderer((256, 256), (100, 60), (300, 400),
+                                   use_lut=use_lut)
+    renderer.set_channel('green', [lazy(tile) for tile
+                                   in channel_tiles['green']],
+                         *settings['green'])
+
+    settings['green'] = (np.array([0, 1, 1]), 0.01, 0.03)
+    renderer.update_channel('green', *settings['green'])
+
+    assert len(loaded) == len(channel_tiles['green'])
+    np.testing.assert_allclose(renderer.render(),
+                               full_render(channel_tiles, settings,
+                                           use_lut=use_lut), atol=1e-12)
+
+
+def test_remove_channel(channel_tiles):
+    '''Match a render of the remaining channels after removing one.'''
+
+    settings = {'red': (np.array([1, 0, 0]), 0, 1)}
+    renderer = IncrementalRenderer((256, 256), (100, 60), (300, 400))
+    renderer.set_channel('green', channel_tiles['green'],
+                         np.array([0, 1, 0]), 0.006, 0.024)
+    renderer.set_channel('red', channel_tiles['red'], *settings['red'])
+    renderer.remove_channel('green')
+    renderer.resync()
+
+    assert len(renderer) == 1 and 'green' not in renderer
+    np.testing.assert_allclose(renderer.render(),
+                               full_render(channel_tiles, settings))
+
+
+def test_exposed_regions():
+    '''Split a panned viewport into the overlap and exposed strips.'''
+
+    overlap, strips = get_exposed_regions((10, 20), (100, 200),
+                                          (40, 0), (100, 200))
+
+    assert overlap == ((40, 20), (70, 180))
+    assert strips == [((10, 20), (30, 200)), ((40, 200), (70, 20))]
+
+    overlap, strips = get_exposed_regions((0, 0), (10, 10), (10, 0),
+                                          (10, 10))
+    assert overlap is None
+    assert strips == [((0, 0), (10, 10))]
+
+
+@pytest.mark.parametrize('as_uint8', [False, True])
+def test_viewport_pan(load_real_tile, real_render, real_channels,
+                      as_uint8):
+    '''Match full renders of panned viewports while loading fewer tiles.'''
+
+    loaded = []
+
+    def load_tile(channel, level, grid):
+        loaded.append(grid)
+        return load_real_tile(channel, level, grid)
+
+    renderer = ViewportRenderer(load_tile, real_channels, (256, 256),
+                                as_uint8=as_uint8)
+    counts = []
+    for origin in [(100, 60), (100, 100), (100, 100), (130, 100)]:
+        loaded.clear()
+        result = renderer.render(origin, (600, 600))
+        counts.append(len(loaded))
+        expected = real_render(real_channels, origin, (600, 600),
+                               as_uint8=as_uint8)
+        np.testing.assert_allclose(result, expected)
+
+    # Only tiles of exposed strips load, and none for the same viewport
+    assert counts == [18, 6, 0, 6]
+
+
+def test_viewport_settings(load_real_tile, real_render, real_channels):
+    '''Render the whole viewport again after the settings change.'''
+
+    renderer = ViewportRenderer(load_real_tile, real_channels, (256, 256))
+    renderer.render((100, 60), (300, 300))
+
+    channels = [dict(real_channels[0], max=0.012), real_channels[1]]
+    renderer.set_channels(channels)
+    np.testing.assert_allclose(renderer.render((110, 60), (300, 300)),
+                               real_render(channels, (110, 60), (300, 300)))
+
+
+def test_viewport_tile_cache(load_real_tile, real_render, real_channels):
+    '''Render new settings from cached tiles without loading them.'''
+
+    loaded = []
+
+    def load_tile(channel, level, grid):
+        loaded.append(grid)
+        return load_real_tile(channel, level, grid)
+
+    renderer = ViewportRenderer(load_tile, real_channels, (256, 256),
+                                dtype=np.float32, tile_cache=TileCache())
+    renderer.render((100, 60), (300, 300))
+    assert len(loaded) == 8
+
+    channels = [dict(real_channels[0], max=0.012), real_channels[1]]
+    renderer.set_channels(channels)
+    result = renderer.render((100, 60), (300, 300))
+
+    assert len(loaded) == 8
+    np.testing.assert_allclose(result, real_render(channels, (100, 60),
+                                                   (300, 300)),
+                               rtol=1e-5, atol=1e-6)
@@ -0,0 +1,62 @@
+'''Compare process pool mosaic results with expected output'''
+
+import pytest
+import numpy as np
+from minerva_lib import mosaic
+from minerva_lib.mosaic import SharedArray, get_tile_bands, render_mosaic
+from minerva_lib.render import composite_subtiles
+
+requires_shared_memory = pytest.mark.skipif(
+    mosaic.shared_memory is None, reason='requires Python 3.8 or later')
+
+
+def test_tile_bands_aligned():
+    '''Split an offset output image into bands along tile rows'''
+
+    expected = [(0, 156), (156, 412), (412, 600)]
+
+    result = get_tile_bands((256, 256), (100, 0), (600, 100))
+
+    assert expected == result
+
+
+@requires_shared_memory
+def test_render_mosaic_matches_subtiles(load_real_tile, real_channels):
+    '''Ensure the process pool render matches a single process render'''
+
+    origin, shape = (100, 50), (800, 900)
+
+    expected = composite_subtiles([{
+        'grid': (y, x),
+        'image': load_real_tile(c, 0, (y, x)),
+        **channel
+    } for y in range(4) for x in range(4)
+        for c, channel in enumerate(real_channels)],
+        (256, 256), origin, shape, dtype=np.float32)
+
+    result = render_mosaic(load_real_tile, real_channels, (256, 256),
+                           origin, shape, processes=2)
+
+    np.testing.assert_allclose(expected, result, rtol=1e-6)
+
+
+@requires_shared_memory
+def test_render_mosaic_shared_out(load_real_tile, real_channels):
+    '''Render a uint8 image into a provided shared memory array'''
+
+    expected = composite_subtiles([{
+        'grid': (y, x),
+        'image': load_real_tile(c, 0, (y, x)),
+        **channel
+    } for y in range(4) for x in range(4)
+        for c, channel in enumerate(real_channels)],
+        (256, 256), (0, 0), (1024, 1024), as_uint8=True)
+
+    with SharedArray((1024, 1024, 3), np.uint8) as out:
+        result = render_mosaic(load_real_tile, real_channels, (256, 256),
+                               (0, 0), (1024, 1024), use_lut=True,
+                               as_uint8=True, out=out, processes=2,
+                               band_tiles=2)
+
+        assert result is out
+        np.testing.assert_allclose(expected, out.array, atol=1)
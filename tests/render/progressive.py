@@ -0,0 +1,93 @@
+'''Compare progressive render results with expected output'''
+
+import pytest
+import numpy as np
+from minerva_lib.render import composite_subtiles, select_grids
+from minerva_lib.progressive import get_level_region, render_progressive
+
+
+@pytest.fixture(scope='module')
+def pyramid(load_real_tile):
+    '''Three level pyramid of the red and green test image.'''
+
+    levels = []
+    for channel in range(2):
+        full = np.block([[load_real_tile(channel, 0, (y, x))
+                          for x in range(4)] for y in range(4)])
+        levels.append([full[::2 ** level, ::2 ** level]
+                       for level in range(3)])
+    return levels
+
+
+def test_level_region():
+    '''Transform and bound a region at coarser levels.'''
+
+    assert get_level_region((100, 60), (300, 400), (1024, 1024),
+                            0) == ((100, 60), (300, 400))
+    assert get_level_region((100, 60), (300, 400), (1024, 1024),
+                            2) == ((25, 15), (75, 100))
+    assert get_level_region((1000, 0), (24, 1024), (1024, 1024),
+                            8) == ((3, 0), (1, 4))
+
+
+def test_render_progressive(pyramid, real_channels):
+    '''Yield upscaled coarse renders before the final full render.'''
+
+    loaded = []
+
+    def load_tile(channel, level, grid):
+        loaded.append(level)
+        y, x = grid
+        return pyramid[channel][level][y * 256:(y + 1) * 256,
+                                       x * 256:(x + 1) * 256]
+
+    renders = list(render_progressive(load_tile, real_channels,
+                                      (256, 256), (1024, 1024), 3,
+                                      (100, 60), (600, 700),
+                                      dtype=np.float64))
+
+    assert [level for level, image in renders] == [2, 1, 0]
+    assert all(image.shape == (600, 700, 3) for level, image in renders)
+    assert loaded.count(2) < loaded.count(1) < loaded.count(0)
+
+    tiles = [dict(channel, grid=grid,
+                  image=load_tile(index, 0, grid))
+             for grid in select_grids((256, 256), (100, 60), (600, 700))
+             for index, channel in enumerate(real_channels)]
+    expected = composite_subtiles(tiles, (256, 256), (100, 60), (600, 700))
+    np.testing.assert_allclose(renders[-1][1], expected)
+
+
+def test_render_progressive_size(pyramid, real_channels):
+    '''End at the level matching a smaller output size.'''
+
+    def load_tile(channel, level, grid):
+        y, x = grid
+        return pyramid[channel][level][y * 256:(y + 1) * 256,
+                                       x * 256:(x + 1) * 256]
+
+    renders = list(render_progressive(load_tile, real_channels,
+                                      (256, 256), (1024, 1024), 3,
+                                      (0, 0), (1024, 1024), output_size=512,
+                                      as_uint8=True))
+
+    assert [level for level, image in renders] == [2, 1]
+    assert all(image.shape == (512, 512, 3) for level, image in renders)
+    assert all(image.dtype == np.uint8 for level, image in renders)
+
+
+def test_render_progressive_viewport(pyramid, real_channels):
+    '''Choose the final level from the viewport rather than the image.'''
+
+    def load_tile(channel, level, grid):
+        y, x = grid
+        return pyramid[channel][level][y * 256:(y + 1) * 256,
+                                       x * 256:(x + 1) * 256]
+
+    renders = list(render_progressive(load_tile, real_channels,
+                                      (256, 256), (1024, 1024), 3,
+                                      (100, 200), (300, 400), output_size=200,
+                                      preview_levels=1))
+
+    assert [level for level, image in renders] == [2, 1]
+    assert all(image.shape == (150, 200, 3) for level, image in renders)
@@ -0,0 +1,125 @@
+'''Compare compiled render settings results with expected output'''
+
+import pytest
+import numpy as np
+from minerva_lib.render import composite_subtiles
+from minerva_lib.settings import RenderSettings
+
+
+@pytest.fixture(scope='module')
+def real_channel_tiles(load_real_tile):
+    '''Tiles of the red and green test image keyed by channel index.'''
+
+    tiles = []
+    for y in range(4):
+        for x in range(4):
+            for channel, source in enumerate([0, 1, 1]):
+                tiles.append({
+                    'grid': (y, x),
+                    'image': load_real_tile(source, 0, (y, x)),
+                    'channel': channel
+                })
+    return tiles
+
+
+@pytest.fixture
+def settings_channels(real_channels):
+    '''Green, red and black channels of the red and green test image.'''
+
+    return real_channels + [{
+        'color': np.array([0, 0, 0], dtype=np.float32),
+        'min': 0,
+        'max': 1
+    }]
+
+
+def test_settings_drop_no_op_channels(settings_channels):
+    '''Drop channels with black colors or empty ranges'''
+
+    channels = settings_channels + [{
+        'color': [1, 1, 1],
+        'min': 0.5,
+        'max': 0.5
+    }, {
+        'color': [1, 1, 1],
+        'min': 1,
+        'max': 1.5
+    }]
+
+    settings = RenderSettings(channels)
+
+    assert len(settings) == 3
+    assert settings.get(0).index == 0
+    assert settings.get(2) is None
+    assert settings.get(4).index == 4
+    with pytest.raises(KeyError):
+        settings.get(5)
+
+
+def test_settings_float_above_one():
+    '''Render float tiles with ranges above 1 as without settings'''
+
+    tiles = [{
+        'channel': 0,
+        'grid': (0, 0),
+        'image': np.full((2, 2), 3.0),
+        'color': [1, 1, 1],
+        'min': 1,
+        'max': 4
+    }]
+    settings = RenderSettings([tiles[0]])
+
+    expected = composite_subtiles(tiles, (2, 2), (0, 0), (2, 2))
+    result = composite_subtiles(tiles, (2, 2), (0, 0), (2, 2),
+                                settings=settings)
+
+    assert expected.max() > 0.8
+    np.testing.assert_allclose(expected, result)
+
+
+@pytest.mark.parametrize('channel', [
+    {'color': [1, 1], 'min': 0, 'max': 1},
+    {'color': [1, -1, 1], 'min': 0, 'max': 1},
+    {'color': [1, 1, 1], 'min': 0.6, 'max': 0.5},
+    {'color': [1, 1, 1], 'min': 0, 'max': np.nan}
+])
+def test_settings_invalid(channel):
+    '''Reject malformed colors and ranges'''
+
+    with pytest.raises(ValueError):
+        RenderSettings([channel])
+
+
+def test_settings_normalize_uint16():
+    '''Fold integer conversion and range into one multiply-add'''
+
+    image = np.array([[0, 12345, 32768, 65535]], dtype=np.uint16)
+    channel = RenderSettings([{
+        'color': [1, 1, 1],
+        'min': 0.25,
+        'max': 0.75
+    }]).get(0)
+
+    expected = np.clip((image / 65535 - 0.25) / 0.5, 0, 1)
+
+    result = channel.normalize(image)
+
+    np.testing.assert_allclose(expected, result)
+
+
+@pytest.mark.parametrize('use_lut', [False, True])
+def test_composite_subtiles_settings(settings_channels, real_channel_tiles,
+                                     use_lut):
+    '''Ensure compiled settings match rendering with per tile settings'''
+
+    expected = composite_subtiles([
+        dict(tile, **settings_channels[tile['channel']])
+        for tile in real_channel_tiles
+    ], (256, 256), (0, 0), (1024, 1024))
+
+    settings = RenderSettings(settings_channels, use_lut=use_lut)
+
+    for _ in range(2):
+        result = composite_subtiles(real_channel_tiles, (256, 256), (0, 0),
+                                    (1024, 1024), settings=settings)
+        np.testing.assert_allclose(expected, result, atol=1e-12)
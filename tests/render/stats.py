@@ -0,0 +1,174 @@
+'''Compare tile statistics index results with expected output'''
+
+import io
+import pytest
+import numpy as np
+from minerva_lib import skimage_inline as ski
+from minerva_lib.render import composite_subtiles
+from minerva_lib import stats as stats_module
+from minerva_lib.stats import (TileStatsIndex, minmax, get_tile_stats,
+                               RENDER, SKIP, SATURATED)
+
+
+@pytest.fixture(scope='module')
+def stats_tiles():
+    '''Background, partial and saturated uint8 tiles of one channel.'''
+
+    background = np.full((2, 2), 10, dtype=np.uint8)
+    partial = np.array([[0, 128], [255, 64]], dtype=np.uint8)
+    saturated = np.full((2, 2), 250, dtype=np.uint8)
+
+    return [{
+        'channel': 0,
+        'grid': (0, x),
+        'image': image,
+        'color': np.array([1, 0.5, 0]),
+        'min': 0.1,
+        'max': 0.9
+    } for x, image in enumerate([background, partial, saturated])]
+
+
+@pytest.fixture(scope='module')
+def stats_index(stats_tiles):
+    index = TileStatsIndex()
+    for tile in stats_tiles:
+        index.add(tile['channel'], 0, tile['grid'], tile['image'])
+    return index
+
+
+def test_tile_stats():
+    '''Normalize statistics of integer tiles by their dtype maximum.'''
+
+    image = np.array([[0, 65535], [65535, 65535]], dtype=np.uint16)
+    stats = get_tile_stats(image)
+
+    np.testing.assert_allclose(stats, (0, 1, 0.75))
+
+
+def test_tile_stats_signed():
+    '''Normalize signed integer tiles as when they are rendered.'''
+
+    image = np.full((2, 2), 100, dtype=np.int16)
+    tiles = [{
+        'channel': 0,
+        'grid': (0, 0),
+        'image': image,
+        'color': np.array([1, 1, 1]),
+        'min': 0.1,
+        'max': 0.5
+    }]
+
+    index = TileStatsIndex()
+    stats = index.add(0, 0, (0, 0), image)
+    np.testing.assert_allclose(stats, ski.img_as_float64(image[:1, :1])[0, 0])
+    assert index.classify(0, 0, (0, 0), 0.1, 0.5) == SKIP
+
+    expected = composite_subtiles(tiles, (2, 2), (0, 0), (2, 2))
+    result = composite_subtiles(tiles, (2, 2), (0, 0), (2, 2), stats=index)
+    np.testing.assert_array_equal(expected, result)
+
+
+def test_classify(stats_index):
+    '''Classify tiles below, within and above the range.'''
+
+    assert stats_index.classify(0, 0, (0, 0), 0.1, 0.9) == SKIP
+    assert stats_index.classify(0, 0, (0, 1), 0.1, 0.9) == RENDER
+    assert stats_index.classify(0, 0, (0, 2), 0.1, 0.9) == SATURATED
+    assert stats_index.classify(0, 0, (0, 0), 0.01, 0.9) == RENDER
+    assert stats_index.classify(1, 0, (0, 0), 0.1, 0.9) == RENDER
+
+    grids = stats_index.select_grids(0, 0, [(0, 0), (0, 1), (0, 2)],
+                                     0.1, 0.9)
+    assert grids == [(0, 1)]
+
+
+def test_save_load(stats_index):
+    '''Restore an index from a saved file.'''
+
+    stream = io.BytesIO()
+    stats_index.save(stream)
+    stream.seek(0)
+    loaded = TileStatsIndex.load(stream)
+
+    assert len(loaded) == len(stats_index)
+    for x in range(3):
+        np.testing.assert_allclose(loaded.get(0, 0, (0, x)),
+                                   stats_index.get(0, 0, (0, x)))
+
+
+def test_composite_with_stats(stats_tiles, stats_index):
+    '''Skip and fill tiles to match a full render.'''
+
+    expected = composite_subtiles(stats_tiles, (2, 2), (0, 0), (2, 6))
+    result = composite_subtiles(stats_tiles, (2, 2), (0, 0), (2, 6),
+                                stats=stats_index)
+
+    np.testing.assert_allclose(expected, result)
+
+
+def test_skip_unloaded(stats_tiles, stats_index):
+    '''Load lazily only tiles that must be rendered.'''
+
+    loaded = []
+
+    def loader(tile):
+        def load():
+            loaded.append(tile['grid'])
+            return tile['image']
+        return load
+
+    tiles = [dict(tile, image=loader(tile)) for tile in stats_tiles]
+    expected = composite_subtiles(stats_tiles, (2, 2), (0, 0), (2, 6))
+    result = composite_subtiles(tiles, (2, 2), (0, 0), (2, 6),
+                                stats=stats_index)
+
+    np.testing.assert_allclose(expected, result)
+    assert loaded == [(0, 1)]
+
+
+def test_composite_without_channel(stats_tiles, stats_index):
+    '''Render tiles without a channel index as without stats.'''
+
+    tiles = [{key: value for key, value in tile.items() if key != 'channel'}
+             for tile in stats_tiles]
+    expected = composite_subtiles(tiles, (2, 2), (0, 0), (2, 6))
+    result = composite_subtiles(tiles, (2, 2), (0, 0), (2, 6),
+                                stats=stats_index)
+
+    np.testing.assert_allclose(expected, result)
+
+
+@pytest.mark.parametrize('dtype', [np.uint16, np.float32, np.int16])
+def test_minmax_blocked(dtype):
+    '''Find the extrema of an image reduced in several blocks'''
+
+    image = np.random.RandomState(0).randint(-500, 500, (1200, 300, 2))
+    image = image.astype(dtype)
+
+    i_min, i_max = minmax(image)
+
+    assert i_min == image.min()
+    assert i_max == image.max()
+
+    strided = image[:, ::3]
+    assert minmax(strided) == (strided.min(), strided.max())
+
+
+def test_index_cached_extrema(monkeypatch):
+    '''Take the extrema of tiles added again from the index cache.'''
+
+    scans = []
+
+    def counting_minmax(image):
+        scans.append(image.shape)
+        return minmax(image)
+
+    monkeypatch.setattr(stats_module, 'minmax', counting_minmax)
+    image = np.array([[0, 128], [255, 64]], dtype=np.uint8)
+    index = TileStatsIndex()
+
+    first = index.add(0, 0, (0, 0), image)
+    second = index.add(0, 1, (0, 0), image)
+
+    assert first == second and len(scans) == 1
+    assert image in index.intensity_stats
@@ -0,0 +1,81 @@
+'''Compare dtype conversion results with expected output'''
+
+import pytest
+import numpy as np
+from minerva_lib import skimage_inline as ski
+
+
+@pytest.mark.parametrize('dtype_in', [np.uint8, np.uint16])
+@pytest.mark.parametrize('dtype_out', [np.float32, np.float64])
+def test_convert_unsigned_to_float_out(dtype_in, dtype_out):
+    '''Convert unsigned integers into an output argument'''
+
+    i_max = np.iinfo(dtype_in).max
+    image = np.array([[0, 1], [i_max // 2, i_max]], dtype=dtype_in)
+    expected = np.multiply(image, 1. / i_max, dtype=dtype_out)
+
+    out = np.full(image.shape, np.nan, dtype=dtype_out)
+    result = ski.convert(image, dtype_out, out=out)
+
+    assert result is out
+    np.testing.assert_array_equal(expected, result)
+    np.testing.assert_array_equal(expected, ski.convert(image, dtype_out))
+
+
+def test_convert_cached_converter():
+    '''Resolve each dtype pair and option to one converter'''
+
+    converter = ski.get_converter(np.uint16, np.float32)
+
+    assert ski.get_converter(np.dtype('uint16'), np.float32) is converter
+    assert ski.get_converter(np.uint16, np.float32,
+                             force_copy=True) is not converter
+    assert ski.get_converter(np.uint8, np.float32) is not converter
+
+
+def test_convert_same_dtype():
+    '''Return the image itself unless a copy is forced'''
+
+    image = np.linspace(0, 1, 5, dtype=np.float32)
+
+    assert ski.convert(image, np.float32) is image
+    assert ski.convert(image, np.floating) is image
+    copy = ski.convert(image, np.float32, force_copy=True)
+    assert copy is not image
+    np.testing.assert_array_equal(image, copy)
+
+
+def test_convert_general_out():
+    '''Convert pairs without a fast path into an output argument'''
+
+    image = np.array([-32768, 0, 32767], dtype=np.int16)
+    expected = ski.convert(image, np.float64)
+
+    out = np.empty(3)
+    result = ski.convert(image, np.float64, out=out)
+
+    assert result is out
+    np.testing.assert_allclose(expected, result)
+    np.testing.assert_allclose([-1, 0, 1], result, atol=1e-4)
+
+    with pytest.raises(ValueError):
+        ski.convert(np.array([2.0]), np.uint8)
+
+
+def test_img_as_float32_float64():
+    '''Convert integer images to an explicit float precision'''
+
+    image = np.array([0, 32768, 65535], dtype=np.uint16)
+
+    result32 = ski.img_as_float32(image)
+    result64 = ski.img_as_float64(image)
+
+    assert result32.dtype == np.float32
+    assert result64.dtype == np.float64
+    assert ski.img_as_float(image).dtype == np.float64
+    np.testing.assert_allclose(result32, image / 65535, rtol=1e-6)
+    np.testing.assert_allclose(result64, image / 65535)
+
+    out = np.empty(3, dtype=np.float32)
+    assert ski.img_as_float32(image, out=out) is out
+    np.testing.assert_array_equal(result32, out)
@@ -0,0 +1,150 @@
+'''Compare exposure results with expected output'''
+
+import pytest
+import numpy as np
+from minerva_lib import skimage_inline as ski
+from minerva_lib.stats import IntensityStats
+
+
+@pytest.fixture
+def f64_ramp():
+    return np.linspace(0, 1, 11)
+
+
+def test_rescale_intensity_range(f64_ramp):
+    '''Stretch and clip a float image to an explicit input range'''
+
+    expected = np.clip((f64_ramp - 0.2) / 0.5, 0, 1)
+
+    result = ski.rescale_intensity(f64_ramp, (0.2, 0.7))
+
+    np.testing.assert_allclose(expected, result, atol=1e-12)
+
+
+def test_rescale_intensity_in_place(f64_ramp):
+    '''Rescale a float image in place by providing an output argument'''
+
+    expected = ski.rescale_intensity(f64_ramp, (0.2, 0.7))
+
+    image = f64_ramp.copy()
+    result = ski.rescale_intensity(image, (0.2, 0.7), out=image)
+
+    assert result is image
+    np.testing.assert_allclose(expected, result)
+
+
+def test_rescale_intensity_integer_out():
+    '''Rescale an integer image into a float32 output argument'''
+
+    image = np.array([0, 100, 200, 255], dtype=np.uint8)
+    out = np.empty(image.shape, dtype=np.float32)
+
+    result = ski.rescale_intensity(image, (100, 200), (0, 1), out=out)
+
+    assert result is out
+    np.testing.assert_allclose([0, 0, 1, 1], result)
+
+
+def test_adjust_gamma_in_place(f64_ramp):
+    '''Gamma correct a float image in place by providing an output argument'''
+
+    expected = f64_ramp ** 0.5 * 2
+
+    image = f64_ramp.copy()
+    result = ski.adjust_gamma(image, 0.5, gain=2, out=image)
+
+    assert result is image
+    np.testing.assert_allclose(expected, result, atol=1e-12)
+    np.testing.assert_allclose(expected, ski.adjust_gamma(f64_ramp, 0.5, 2))
+
+
+def test_adjust_gamma_integer_out(f64_ramp):
+    '''Gamma correct a float image directly into uint8 display values'''
+
+    expected = np.uint8(255 * f64_ramp ** (1 / 2.2))
+
+    out = np.empty(f64_ramp.shape, dtype=np.uint8)
+    result = ski.adjust_gamma(f64_ramp, 1 / 2.2, out=out)
+
+    assert result is out
+    np.testing.assert_array_equal(expected, result)
+
+
+def test_adjust_gamma_integer_image():
+    '''Keep the dtype and range of integer images'''
+
+    image = np.array([0, 64, 255], dtype=np.uint8)
+    expected = np.uint8(((image / 255) ** 2) * 255)
+
+    result = ski.adjust_gamma(image, 2)
+
+    assert result.dtype == np.uint8
+    np.testing.assert_array_equal(expected, result)
+
+    out = np.empty(3)
+    result = ski.adjust_gamma(image, 2, out=out)
+
+    assert result is out
+    np.testing.assert_allclose(((image / 255) ** 2) * 255, result)
+
+
+def test_intensity_range_stats():
+    '''Answer the image range of a cached image without scanning it'''
+
+    stats = IntensityStats()
+    image = np.array([0.25, 0.5, 0.75])
+
+    assert ski.intensity_range(image, stats=stats) == (0.25, 0.75)
+    assert image in stats
+
+    # Cached extrema are kept until the image is discarded
+    image[0] = 0
+    assert ski.intensity_range(image, stats=stats) == (0.25, 0.75)
+    stats.discard(image)
+    assert ski.intensity_range(image, stats=stats) == (0, 0.75)
+
+    del image
+    assert len(stats) == 0
+
+
+def test_adjust_gamma_stats():
+    '''Check for negative values from cached image extrema'''
+
+    stats = IntensityStats()
+    image = np.array([-0.5, 0.5])
+
+    with pytest.raises(ValueError):
+        ski.adjust_gamma(image, 2, stats=stats)
+    assert image in stats
+
+    stats.clear()
+    image[0] = 0
+    np.testing.assert_allclose([0, 0.25],
+                               ski.adjust_gamma(image, 2, stats=stats))
+
+
+def test_rescale_intensity_inverted_range(f64_ramp):
+    '''Clip every value to the maximum of an inverted input range'''
+
+    expected = np.ones(f64_ramp.shape)
+
+    np.testing.assert_array_equal(
+        expected, ski.rescale_intensity(f64_ramp, (0.7, 0.2)))
+
+    image = f64_ramp.copy()
+    result = ski.rescale_intensity(image, (0.7, 0.2), out=image)
+
+    assert result is image
+    np.testing.assert_array_equal(expected, result)
+
+
+def test_adjust_gamma_empty():
+    '''Gamma correct an empty image without checking its values'''
+
+    image = np.zeros((0, 3))
+
+    result = ski.adjust_gamma(image, 0.5)
+    assert result.shape == (0, 3)
+
+    result = ski.adjust_gamma(image, 0.5, stats=IntensityStats())
+    assert result.shape == (0, 3)